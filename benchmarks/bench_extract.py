@@ -0,0 +1,123 @@
+"""Per-page latency and memory of catalog page text extraction.
+
+Usage:
+    python -m benchmarks.bench_extract pages/*.html
+    python -m benchmarks.bench_extract --save pages URL [URL ...]
+
+Compares the original whole-document extraction with data_quality.fetch's
+full and targeted (CKAN content region only) modes on saved HTML pages.
+Without arguments it runs on a synthetic CKAN dataset page. --save
+downloads the given dataset pages into a directory first, so later runs
+work offline.
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from data_quality.fetch import HTML_PARSER, extract_text
+
+
+def legacy_extract_text(html: str) -> str:
+    """The extraction open_data and standards used before fetch.extract_text."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style', 'head', 'title', 'meta', '[document]']):
+        element.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = ' '.join(chunk for chunk in chunks if chunk)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+EXTRACTORS: Dict[str, Callable[[str], str]] = {
+    "legacy": legacy_extract_text,
+    "full": lambda html: extract_text(html, targeted=False),
+    "targeted": extract_text,
+}
+
+
+def synthetic_ckan_page(resources: int = 40, nav_links: int = 300) -> str:
+    """A dataset page shaped like CKAN's templates, with heavy navigation around the content."""
+    nav = "".join(f'<li><a href="/group/g{i}">Grupo {i}</a></li>' for i in range(nav_links))
+    rows = "".join(
+        f'<li class="resource-item"><a class="heading" href="/r/{i}">Recurso {i}'
+        f'<span class="format-label">{"CSV" if i % 2 else "XLSX"}</span></a>'
+        f'<p class="description">Datos mensuales del periodo {i}.</p></li>'
+        for i in range(resources)
+    )
+    return (
+        '<html><head><title>Conjunto</title><meta charset="utf-8"><style>.x{color:red}</style>'
+        '<script>var tracking = 1;</script></head><body>'
+        f'<header class="masthead"><nav><ul>{nav}</ul></nav></header>'
+        '<div class="main"><div id="content" class="container">'
+        '<div class="toolbar"><ol class="breadcrumb"><li>Inicio</li><li>Conjuntos</li></ol></div>'
+        '<div class="row wrapper"><div class="primary col-sm-9" role="main">'
+        '<h1>Incidencia delictiva</h1><div class="notes"><p>Registros   de incidencia\n  por municipio.</p></div>'
+        f'<ul class="resource-list">{rows}</ul>'
+        '<table class="table"><tr><th>Última actualización</th><td>1 de marzo de 2024</td></tr>'
+        '<tr><th>Frecuencia</th><td>Mensual</td></tr></table></div>'
+        '<aside class="secondary col-sm-3"><section class="module module-narrow module-shallow license">'
+        '<h2 class="module-heading">Licencia</h2>'
+        '<p class="module-content">Creative Commons Attribution</p></section></aside></div></div></div>'
+        f'<footer><ul>{nav}</ul><script>var footer = 2;</script></footer></body></html>'
+    )
+
+
+def measure(extractor: Callable[[str], str], html: str, repeat: int) -> Dict[str, float]:
+    """Median latency in milliseconds and peak traced memory in KiB of one extractor."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor(html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    extractor(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": statistics.median(timings) * 1000, "peak_kib": peak / 1024}
+
+
+def save_pages(urls: List[str], directory: str) -> List[str]:
+    from data_quality.fetch import get_fetcher
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for url in urls:
+        path = os.path.join(directory, re.sub(r'[^\w.-]+', '_', url.split("://")[-1]) + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(get_fetcher().get(url).text)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark catalog page text extraction.")
+    parser.add_argument("pages", nargs="*", help="Saved HTML pages, or URLs with --save")
+    parser.add_argument("--save", metavar="DIR", help="Download the given URLs into DIR, then benchmark them")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.save:
+        pages = {path: open(path, encoding="utf-8").read() for path in save_pages(args.pages, args.save)}
+    elif args.pages:
+        pages = {path: open(path, encoding="utf-8", errors="replace").read() for path in args.pages}
+    else:
+        pages = {"synthetic CKAN page": synthetic_ckan_page()}
+
+    print(f"parser: {HTML_PARSER}")
+    print(f"{'page':<40} {'KiB':>7} " + " ".join(f"{name + ' ms':>12} {name + ' KiB':>13}" for name in EXTRACTORS))
+    for name, html in pages.items():
+        results = {extractor: measure(fn, html, args.repeat) for extractor, fn in EXTRACTORS.items()}
+        print(f"{os.path.basename(name)[:40]:<40} {len(html.encode()) / 1024:>7.1f} " + " ".join(
+            f"{r['ms']:>12.2f} {r['peak_kib']:>13.0f}" for r in results.values()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Time and peak memory of writing a data quality report to disk.
+
+Usage:
+    python -m benchmarks.bench_serialize
+    python -m benchmarks.bench_serialize --columns 2000 --distinct 500
+
+Compares the ways reports have been written (the notebooks' CustomJSONizer,
+simplejson with default=str, json.dump with the json_default fallback) with
+data_quality.serialize: generate_report converts to native values once
+(timed on its own as "to_native"), after which the report is written with
+plain json.dump or streamed with dump_json. The report is synthetic, shaped
+like generate_report's output and holding numpy values where the analyzer
+produces them.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, IO
+
+import numpy as np
+
+from data_quality.serialize import dump_json, to_native
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+def json_default(obj):
+    """The json.dump fallback technical.py had before reports held native values."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+class CustomJSONizer(json.JSONEncoder):
+    """The encoder the notebooks used; it writes np.bool_ as the string "true"."""
+
+    def default(self, obj):
+        if isinstance(obj, np.bool_):
+            return super().encode(bool(obj))
+        return super().default(obj)
+
+
+def synthetic_report(columns: int = 500, distinct: int = 200) -> Dict[str, Any]:
+    """A report of `columns` columns with numpy scalars, each listing `distinct` duplicate values."""
+    rng = np.random.default_rng(0)
+    names = [f"columna_{i}" for i in range(columns)]
+    counts = rng.integers(0, 10_000, size=(columns, distinct))
+    return {
+        "metadata": {"filename": "synthetic.csv", "total_rows": 100_000, "total_columns": columns,
+                     "columns": names},
+        "quality_checks": {
+            "completeness": {
+                "metrics": {"null_counts_by_column": {name: np.int64(counts[i, 0]) for i, name in enumerate(names)}},
+                "validations": {name: {"passed": np.bool_(counts[i, 0] < 5000), "score": np.float64(counts[i, 1] / 1e4)}
+                                for i, name in enumerate(names)},
+            },
+            "uniqueness": {
+                "metrics": {name: {"unique_ratio": np.float64(counts[i, 2] / 1e4),
+                                   "is_unique": np.bool_(False),
+                                   "duplicate_values": {f"valor {j}": np.int64(counts[i, j]) for j in range(distinct)}}
+                            for i, name in enumerate(names)},
+            },
+        },
+    }
+
+
+def _json_default(report, f):
+    json.dump(report, f, default=json_default)
+
+
+def _notebook(report, f):
+    # Only np.bool_ is handled; the other numpy values here are float64 (a float subclass) and int64
+    json.dump(report, f, cls=CustomJSONizer, default=json_default)
+
+
+def _simplejson(report, f):
+    simplejson.dump(report, f, default=str, ignore_nan=True)
+
+
+def _to_native(report, f):
+    to_native(report)
+
+
+# Writers of the report as the analyzer used to return it
+WRITERS: Dict[str, Callable[[Dict[str, Any], IO[str]], None]] = {
+    "CustomJSONizer": _notebook,
+    "json default": _json_default,
+    "to_native": _to_native,
+}
+if simplejson is not None:
+    WRITERS["simplejson"] = _simplejson
+# Writers of the native report generate_report now returns
+NATIVE_WRITERS: Dict[str, Callable[[Dict[str, Any], IO[str]], None]] = {
+    "native json.dump": json.dump,
+    "native json.dumps": lambda report, f: f.write(json.dumps(report)),
+    "native dump_json": dump_json,
+}
+
+
+def measure(writer: Callable, report: Dict[str, Any], path: str, repeat: int) -> Dict[str, float]:
+    """Median write time in milliseconds, peak traced memory in MiB and file size in MiB of one writer."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with open(path, "w") as f:
+            writer(report, f)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    with open(path, "w") as f:
+        writer(report, f)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": statistics.median(timings) * 1000, "peak_mib": peak / 2 ** 20,
+            "file_mib": os.path.getsize(path) / 2 ** 20}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report serialization.")
+    parser.add_argument("--columns", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=200, help="Duplicate values listed per column")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    report = synthetic_report(args.columns, args.distinct)
+    native = to_native(report)
+    if simplejson is None:
+        print("simplejson is not installed; skipping it")
+    print(f"{'writer':<18} {'ms':>9} {'peak MiB':>9} {'file MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "report.json")
+        for name, writer in [*WRITERS.items(), *NATIVE_WRITERS.items()]:
+            result = measure(writer, native if name in NATIVE_WRITERS else report, path, args.repeat)
+            print(f"{name:<18} {result['ms']:>9.1f} {result['peak_mib']:>9.1f} {result['file_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Offline benchmark suite with a regression check against stored baselines.
+
+Usage:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --save benchmarks/baseline.json
+    python -m benchmarks.bench_suite --check benchmarks/baseline.json
+
+Generates synthetic CSVs (benchmarks.synthetic) that vary rows, columns,
+cardinality, null rate, string length and encoding, and measures the median
+time and peak traced memory of every step of a technical analysis: loading,
+profiling, each DataQualityAnalyzer.analyze_* method, a completeness-only
+report and a full generate_report. The page text extraction behind
+extract_webpage_text runs on the synthetic CKAN page of bench_extract, so
+nothing touches the network.
+
+--check compares the run with a baseline and exits with status 1 when a step
+got slower or bigger than the tolerance allows. Timings depend on the
+machine: save a baseline on the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.bench_extract import synthetic_ckan_page
+from benchmarks.synthetic import write_synthetic_csv
+from data_quality.fetch import extract_page, extract_text
+from data_quality.technical import CHECKS, DataQualityAnalyzer
+
+CASES: Dict[str, Dict[str, Any]] = {
+    "base": {"rows": 20_000, "columns": 12},
+    "wide": {"rows": 5_000, "columns": 60},
+    "high_cardinality": {"rows": 20_000, "columns": 12, "cardinality": 5_000},
+    "sparse": {"rows": 20_000, "columns": 12, "null_rate": 0.5},
+    "long_strings": {"rows": 20_000, "columns": 12, "string_length": 200},
+    "cp1252": {"rows": 20_000, "columns": 12, "encoding": "cp1252"},
+}
+# Differences below these are noise, whatever the ratio
+MIN_MS_DIFFERENCE = 2.0
+MIN_KIB_DIFFERENCE = 256.0
+
+
+def measure(step: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            repeat: int = 3) -> Dict[str, float]:
+    """Median time in milliseconds and peak traced memory in KiB of step(setup()); setup is not measured."""
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        step(state)
+        timings.append(time.perf_counter() - start)
+    state = setup() if setup else None
+    tracemalloc.start()
+    step(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": round(statistics.median(timings) * 1000, 2), "peak_kib": round(peak / 1024, 1)}
+
+
+def _profiled(path: str) -> DataQualityAnalyzer:
+    analyzer = DataQualityAnalyzer(path)
+    analyzer.profile_columns()
+    return analyzer
+
+
+def bench_dataset(path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measures every step of the technical analysis of one file."""
+    results = {
+        "load": measure(lambda _: DataQualityAnalyzer(path), repeat=repeat),
+        "profile_columns": measure(lambda analyzer: analyzer.profile_columns(),
+                                   lambda: DataQualityAnalyzer(path), repeat),
+    }
+    for check in CHECKS:
+        # On profiled analyzers, so each method is measured on its own
+        results[f"analyze_{check}"] = measure(lambda analyzer: getattr(analyzer, f"analyze_{check}")(),
+                                              lambda: _profiled(path), repeat)
+    results["completeness_only_report"] = measure(lambda analyzer: analyzer.generate_report(["completeness"]),
+                                                  lambda: DataQualityAnalyzer(path), repeat)
+    results["generate_report"] = measure(lambda analyzer: analyzer.generate_report(),
+                                         lambda: DataQualityAnalyzer(path), repeat)
+    return results
+
+
+def bench_extraction(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measures the HTML extraction of extract_webpage_text and get_webpage_content on a synthetic page."""
+    html = synthetic_ckan_page()
+    return {
+        "extract_text": measure(lambda _: extract_text(html), repeat=repeat),
+        "extract_page": measure(lambda _: extract_page(html), repeat=repeat),
+    }
+
+
+def run_suite(cases: List[str], repeat: int = 3, scale: float = 1.0) -> Dict[str, Any]:
+    """Runs the suite on freshly generated files; rows of every case are multiplied by scale."""
+    results: Dict[str, Any] = {
+        "environment": {"python": platform.python_version(), "pandas": pd.__version__,
+                        "machine": platform.machine(), "cpus": os.cpu_count()},
+        "repeat": repeat,
+        "scale": scale,
+        "cases": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for case in cases:
+            options = dict(CASES[case])
+            options["rows"] = max(1, int(options["rows"] * scale))
+            path = write_synthetic_csv(os.path.join(directory, f"{case}.csv"), **options)
+            results["cases"][case] = bench_dataset(path, repeat)
+    results["cases"]["page_extraction"] = bench_extraction(repeat)
+    return results
+
+
+def check_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                      memory_tolerance: float) -> List[str]:
+    """Steps slower than baseline * (1 + tolerance) or bigger than baseline * (1 + memory_tolerance)."""
+    if baseline.get("scale") != results["scale"]:
+        return [f"baseline was run at scale {baseline.get('scale')}, this run at {results['scale']}"]
+    failures = []
+    for case, steps in results["cases"].items():
+        for step, measured in steps.items():
+            expected = baseline["cases"].get(case, {}).get(step)
+            if expected is None:
+                continue
+            if (measured["ms"] > expected["ms"] * (1 + tolerance)
+                    and measured["ms"] - expected["ms"] > MIN_MS_DIFFERENCE):
+                failures.append(f"{case}/{step}: {measured['ms']:.1f} ms, baseline {expected['ms']:.1f} ms")
+            if (measured["peak_kib"] > expected["peak_kib"] * (1 + memory_tolerance)
+                    and measured["peak_kib"] - expected["peak_kib"] > MIN_KIB_DIFFERENCE):
+                failures.append(f"{case}/{step}: {measured['peak_kib']:.0f} KiB peak, "
+                                f"baseline {expected['peak_kib']:.0f} KiB")
+    return failures
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    print(f"{'case':<18} {'step':<26} {'ms':>9} {'peak KiB':>10}" + (f" {'vs base':>8}" if baseline else ""))
+    for case, steps in results["cases"].items():
+        for step, measured in steps.items():
+            line = f"{case:<18} {step:<26} {measured['ms']:>9.1f} {measured['peak_kib']:>10.0f}"
+            expected = (baseline or {}).get("cases", {}).get(case, {}).get(step)
+            if expected and expected["ms"]:
+                line += f" {measured['ms'] / expected['ms']:>7.2f}x"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the rows of every case")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a new baseline")
+    parser.add_argument("--check", metavar="PATH", help="Fail when a step regressed against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="Allowed peak memory growth")
+    args = parser.parse_args(argv)
+
+    unknown = [case for case in args.cases.split(",") if case not in CASES]
+    if unknown:
+        parser.error(f"unknown cases {unknown}; choose from {list(CASES)}")
+    results = run_suite(args.cases.split(","), args.repeat, args.scale)
+
+    baseline = None
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline is not None:
+        failures = check_regressions(results, baseline, args.tolerance, args.memory_tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
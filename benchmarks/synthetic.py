@@ -0,0 +1,69 @@
+"""Synthetic CSV datasets for the benchmarks.
+
+The generated files look like the catalog's CSVs: a mix of integer, decimal,
+date, e-mail, categorical and free-text columns with Spanish text, nulls
+sprinkled at a given rate and written in a given encoding. The same
+arguments always produce the same file.
+"""
+import os
+from typing import Dict, Any
+
+import numpy as np
+import pandas as pd
+
+# Column kinds, cycled through in this order
+KINDS = ("int", "float", "category", "text", "date", "email")
+WORDS = np.array(["año", "niño", "señal", "educación", "salud", "vía", "médico", "obra", "pública",
+                  "municipio", "dependencia", "número", "política", "género", "información", "región"])
+
+
+def synthetic_frame(rows: int = 10_000, columns: int = 12, cardinality: int = 50, null_rate: float = 0.05,
+                    string_length: int = 20, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a DataFrame of mixed column kinds.
+
+    Args:
+        rows (int): Number of rows
+        columns (int): Number of columns, cycling through KINDS
+        cardinality (int): Distinct values in categorical columns
+        null_rate (float): Share of empty cells in every column
+        string_length (int): Approximate characters per free-text cell
+        seed (int): Random seed
+
+    Returns:
+        DataFrame: The synthetic table
+    """
+    rng = np.random.default_rng(seed)
+    words_per_cell = max(1, string_length // 8)
+    data: Dict[str, Any] = {}
+    for i in range(columns):
+        kind = KINDS[i % len(KINDS)]
+        name = f"{kind}_{i}"
+        if kind == "int":
+            values = pd.Series(rng.integers(0, 1_000_000, rows), dtype="Int64")
+        elif kind == "float":
+            values = pd.Series(np.round(rng.normal(5_000, 1_500, rows), 2))
+        elif kind == "category":
+            labels = np.array([f"{WORDS[j % len(WORDS)]} {j}" for j in range(cardinality)], dtype=object)
+            values = pd.Series(labels[rng.integers(0, cardinality, rows)])
+        elif kind == "text":
+            picks = rng.integers(0, len(WORDS), (rows, words_per_cell))
+            values = pd.Series([" ".join(row) for row in WORDS[picks]])
+        elif kind == "date":
+            values = pd.Series(pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1_500, rows), unit="D"))
+            values = values.dt.strftime("%Y-%m-%d")
+        else:
+            values = pd.Series([f"usuario{n}@correo.gob.mx" for n in rng.integers(0, cardinality * 10, rows)])
+        if null_rate:
+            values = values.mask(rng.random(rows) < null_rate)
+        data[name] = values
+    return pd.DataFrame(data)
+
+
+def write_synthetic_csv(path: str, encoding: str = "utf-8", **options) -> str:
+    """Writes synthetic_frame(**options) to a CSV file in the given encoding; returns the path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    synthetic_frame(**options).to_csv(path, index=False, encoding=encoding)
+    return path
@@ -0,0 +1,276 @@
+"""Parallel, resumable batch evaluation of a dataset catalog.
+
+Usage:
+    python -m data_quality.batch datasets.csv --data-dir data --output-dir results --workers 4
+
+The catalog CSV has a `file` column (relative to --data-dir) and a `url`
+column with the dataset page. Every dataset's evaluation is written to its own
+JSON file in --output-dir as soon as it finishes and logged to progress.jsonl,
+so an interrupted run picks up where it stopped when started again.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Callable, List, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from .fetch import run_sync
+from .instrumentation import CSVExporter
+from .pipeline import CPU, Stage, run_stages
+from .serialize import dump_json
+
+STAGES = ("technical", "standards", "open_data")
+PROGRESS_FILE = "progress.jsonl"
+TIMINGS_FILE = "timings.csv"
+
+logger = logging.getLogger(__name__)
+
+
+def output_name(file_name: str) -> str:
+    """File-system safe name of a dataset's result file."""
+    return re.sub(r'[^\w.-]+', '_', file_name) + ".json"
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Stream JSON to a temporary file and move it into place."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        dump_json(data, f)
+    os.replace(tmp_path, path)
+
+
+def _technical_stage(file_path: str, cache_dir: Optional[str], state_path: Optional[str]) -> Dict[str, Any]:
+    from data_quality import technical
+
+    return technical.evaluate(file_path, cache=cache_dir, incremental=state_path is not None, state_path=state_path)
+
+
+def _standards_stage(url: str, use_llm_cache: bool, data_evaluation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from data_quality import standards
+
+    return standards.evaluate(data_evaluation, url, use_cache=use_llm_cache)
+
+
+def _open_data_stage(url: str, use_llm_cache: bool) -> Dict[str, Any]:
+    from data_quality import open_data
+
+    return open_data.evaluate(url, use_cache=use_llm_cache)
+
+
+def dataset_stages(row: Dict[str, Any], data_dir: str, stages: Iterable[str] = STAGES,
+                   cache_dir: Optional[str] = None, state_dir: Optional[str] = None,
+                   use_llm_cache: bool = True) -> List[Stage]:
+    """Stage graph of one catalog row: standards waits for the technical report, open_data does not."""
+    state_path = os.path.join(state_dir, output_name(row["file"]) + ".state.pkl") if state_dir else None
+    graph = [Stage("technical", partial(_technical_stage, os.path.join(data_dir, row["file"]), cache_dir, state_path),
+                   kind=CPU)]
+    if "standards" in stages:
+        graph.append(Stage("standards", partial(_standards_stage, row["url"], use_llm_cache), after=["technical"]))
+    if "open_data" in stages:
+        graph.append(Stage("open_data", partial(_open_data_stage, row["url"], use_llm_cache)))
+    return graph
+
+
+async def evaluate_dataset_async(row: Dict[str, Any], data_dir: str, output_dir: str,
+                                 stages: Iterable[str] = STAGES, cache_dir: Optional[str] = None,
+                                 state_dir: Optional[str] = None, use_llm_cache: bool = True,
+                                 cpu_executor: Optional[Executor] = None,
+                                 io_executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """Run the evaluation stages for one catalog row, overlapping them where possible, and write its result file.
+
+    The result's metadata lists the timings of every stage: those of the
+    technical analysis (recorded where it ran) followed by the page fetches,
+    extractions and LLM calls made here.
+    """
+    from .instrumentation import recording_stages
+    from .llm import recording_calls
+
+    start = time.perf_counter()
+    graph = dataset_stages(row, data_dir, stages, cache_dir, state_dir, use_llm_cache)
+    with recording_calls() as llm_calls, recording_stages() as timings:
+        results, stage_seconds = await run_stages(graph, cpu_executor, io_executor)
+
+    data_evaluation = results["technical"]
+    if "standards" in results:
+        data_evaluation["standards_match"] = results["standards"]
+    if "open_data" in results:
+        data_evaluation["open_data_grading"] = results["open_data"]
+    if llm_calls:
+        # Latency, requests and correction rounds of every LLM call
+        data_evaluation["llm_calls"] = llm_calls
+    timings = data_evaluation["metadata"].get("timings", []) + timings
+    data_evaluation["metadata"]["timings"] = timings
+
+    write_json_atomic(os.path.join(output_dir, output_name(row["file"])), data_evaluation)
+    return {"file": row["file"], "status": "done", "seconds": round(time.perf_counter() - start, 3),
+            "stages": stage_seconds, "timings": timings}
+
+
+def evaluate_dataset(row: Dict[str, Any], data_dir: str, output_dir: str,
+                     stages: Iterable[str] = STAGES, cache_dir: Optional[str] = None,
+                     state_dir: Optional[str] = None, use_llm_cache: bool = True) -> Dict[str, Any]:
+    """Blocking evaluate_dataset_async, with every stage on a thread of this process."""
+    return run_sync(evaluate_dataset_async(row, data_dir, output_dir, stages, cache_dir, state_dir, use_llm_cache))
+
+
+def completed_datasets(datasets: pd.DataFrame, output_dir: str) -> set:
+    """Files of the catalog whose result is already on disk.
+
+    Result files are only moved into place once fully written, so their
+    presence alone marks a dataset as done, even if the run died before
+    logging it to the progress file.
+    """
+    return {name for name in datasets["file"] if os.path.exists(os.path.join(output_dir, output_name(name)))}
+
+
+def run_batch(datasets: pd.DataFrame, data_dir: str, output_dir: str, workers: int = 1,
+              stages: Iterable[str] = STAGES, cache_dir: Optional[str] = None,
+              state_dir: Optional[str] = None, use_llm_cache: bool = True,
+              concurrency: Optional[int] = None,
+              exporters: Optional[Iterable[Callable[[Dict[str, Any]], None]]] = None) -> List[Dict[str, Any]]:
+    """Evaluate every pending dataset of the catalog.
+
+    Technical analyses run across a pool of `workers` processes, while page
+    fetches and LLM calls run on threads of this process, so up to
+    `concurrency` datasets (twice the workers by default) are in flight and
+    one's network stages overlap another's analysis.
+
+    Each finished dataset's stage timings are passed, with a dataset field,
+    to every exporter; by default they are appended to timings.csv in
+    output_dir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    stages = tuple(stages)
+    done = completed_datasets(datasets, output_dir)
+    pending = [row for row in datasets.to_dict("records") if row["file"] not in done]
+    logger.info("%d datasets done, %d pending", len(done), len(pending))
+    concurrency = concurrency or 2 * workers
+    if exporters is None:
+        exporters = [CSVExporter(os.path.join(output_dir, TIMINGS_FILE))]
+    return run_sync(_run_pending(pending, data_dir, output_dir, workers, stages, cache_dir, state_dir,
+                                 use_llm_cache, concurrency, list(exporters)))
+
+
+async def _run_pending(pending: List[Dict[str, Any]], data_dir: str, output_dir: str, workers: int,
+                       stages: Tuple[str, ...], cache_dir: Optional[str], state_dir: Optional[str],
+                       use_llm_cache: bool, concurrency: int,
+                       exporters: List[Callable[[Dict[str, Any]], None]]) -> List[Dict[str, Any]]:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def evaluate(row):
+        async with slots:
+            try:
+                return await evaluate_dataset_async(row, data_dir, output_dir, stages, cache_dir, state_dir,
+                                                    use_llm_cache, cpu_pool, io_pool)
+            except Exception as e:
+                logger.warning("%s failed: %s", row["file"], e)
+                return {"file": row["file"], "status": "failed", "error": str(e),
+                        "traceback": traceback.format_exc()}
+
+    results = []
+    # Forking this process would copy the locks its threads (scheduler loop, stages) may hold
+    mp_context = multiprocessing.get_context("forkserver")
+    # The thread pool fits two network stages for every dataset in flight
+    with open(os.path.join(output_dir, PROGRESS_FILE), "a") as progress, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=2 * concurrency, thread_name_prefix="stage") as io_pool:
+        for next_result in asyncio.as_completed([evaluate(row) for row in pending]):
+            result = await next_result
+            if result["status"] == "done":
+                logger.info("%s done in %ss", result["file"], result["seconds"])
+                # The full timings are in the result file; progress only keeps the stage totals
+                for timing in result.pop("timings"):
+                    for export in exporters:
+                        export({"dataset": result["file"], **timing})
+            progress.write(json.dumps(result) + "\n")
+            progress.flush()
+            results.append(result)
+    return results
+
+
+def combine_results(datasets: pd.DataFrame, output_dir: str, combined_path: str) -> None:
+    """Stream the per-dataset files into one {file: evaluation} JSON document."""
+    with open(combined_path, "w") as out:
+        out.write("{")
+        first = True
+        for name in datasets["file"]:
+            path = os.path.join(output_dir, output_name(name))
+            if not os.path.exists(path):
+                continue
+            out.write(("" if first else ", ") + json.dumps(name) + ": ")
+            with open(path) as f:
+                out.write(f.read())
+            first = False
+        out.write("}")
+
+
+def store_results(datasets: pd.DataFrame, output_dir: str, database: str) -> int:
+    """Load the per-dataset files into a queryable ResultsStore, one file at a time; returns the count."""
+    from .results_store import ResultsStore
+
+    store = ResultsStore(database)
+    stored = 0
+    for row in datasets.to_dict("records"):
+        path = os.path.join(output_dir, output_name(row["file"]))
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            store.add(json.load(f), dataset=row["file"], url=row.get("url"))
+        stored += 1
+    return stored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a catalog of open datasets.")
+    parser.add_argument("catalog", help="CSV with `file` and `url` columns")
+    parser.add_argument("--data-dir", default="data", help="Directory holding the dataset files")
+    parser.add_argument("--output-dir", default="results", help="Directory for per-dataset results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for the technical analysis")
+    parser.add_argument("--concurrency", type=int,
+                        help="Datasets in flight at once (default: twice the workers)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="Comma-separated stages to run; technical always runs")
+    parser.add_argument("--combine", metavar="PATH",
+                        help="Also write every result into a single JSON file")
+    parser.add_argument("--results-db", metavar="PATH",
+                        help="Also load every result into a queryable SQLite store")
+    parser.add_argument("--cache-dir", help="Reuse technical reports of unchanged files from this directory")
+    parser.add_argument("--state-dir",
+                        help="Keep analyzer state here and only re-read rows appended since the last run")
+    parser.add_argument("--refresh-llm", action="store_true",
+                        help="Ask the LLMs again instead of reusing cached answers (DQ_LLM_CACHE)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    # The LLM client logs every HTTP request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    datasets = pd.read_csv(args.catalog)
+    results = run_batch(datasets, args.data_dir, args.output_dir, args.workers, args.stages.split(","),
+                        args.cache_dir, args.state_dir, not args.refresh_llm, args.concurrency)
+    failed = [r for r in results if r["status"] == "failed"]
+    if args.combine:
+        combine_results(datasets, args.output_dir, args.combine)
+    if args.results_db:
+        logger.info("%d results stored in %s", store_results(datasets, args.output_dir, args.results_db),
+                    args.results_db)
+    logger.info("%d evaluated, %d failed", len(results) - len(failed), len(failed))
+    if args.cache_dir:
+        from .cache import ReportCache
+        logger.info("report cache: %s", ReportCache(args.cache_dir).stats())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
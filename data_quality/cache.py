@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .serialize import dump_json
+from .technical import ANALYSIS_VERSION
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+STATS_FILE = "stats.json"
+_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """On-disk cache of technical reports keyed by file content.
+
+    The key hashes the file bytes together with ANALYSIS_VERSION and the
+    analyzer options, so renaming or touching a file still hits while any
+    change to its content, to the analysis or to the options misses. Entries
+    are evicted least-recently-used first once the directory exceeds
+    max_bytes. Hit/miss counters are accumulated in stats.json, which several
+    batch workers can share.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> str:
+        digest = hashlib.sha256(file_digest(file_path).encode())
+        digest.update(ANALYSIS_VERSION.encode())
+        digest.update(json.dumps(options or {}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached report for a key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._record(misses=1)
+            return None
+        # The modification time doubles as the last-used time for LRU eviction
+        os.utime(path)
+        self._record(hits=1)
+        return report
+
+    def put(self, key: str, report: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            dump_json(report, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and name != STATS_FILE:
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # Another worker evicted it first
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            self._record(evictions=evicted)
+        return evicted
+
+    @contextmanager
+    def _locked_stats(self):
+        with open(os.path.join(self.directory, STATS_FILE), "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                stats = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                stats = {}
+            yield stats
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(stats))
+
+    def _record(self, **counts: int) -> None:
+        with self._locked_stats() as stats:
+            for name, count in counts.items():
+                stats[name] = stats.get(name, 0) + count
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative hits, misses, evictions and hit rate of this cache directory."""
+        with self._locked_stats() as stored:
+            stats = {"hits": 0, "misses": 0, "evictions": 0, **stored}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        return stats
@@ -0,0 +1,166 @@
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .fetch import get_fetcher
+
+# Point package_show at another CKAN instance (e.g. a local stand-in) instead of the page's host
+CKAN_URL = os.environ.get("DQ_CKAN_URL")
+
+EXISTS = "Does the data exist?"
+ONLINE = "Is it available online from government in any form?"
+MACHINE_READABLE = "Is the dataset provided in machine-readable and reusable formats?"
+AS_A_WHOLE = "Is the machine-readable and reusable data available as a whole?"
+FREE_OF_CHARGE = "Is the dataset available free of charge?"
+OPEN_LICENSE = "Is the data openly licensed?"
+UP_TO_DATE = "Is the dataset up to date?"
+REGULARLY_UPDATED = "Is the dataset being kept regularly updated?"
+
+OPEN_FORMATS = {"CSV", "TSV", "JSON", "GEOJSON", "XML", "RDF", "ODS", "KML", "PARQUET", "TXT"}
+# Machine-readable, but tied to proprietary software
+PROPRIETARY_FORMATS = {"XLS", "XLSX", "SHP", "DBF", "MDB", "ACCDB"}
+OPEN_LICENSES = {
+    "cc-by", "cc-by-4.0", "cc-by-sa", "cc-by-sa-4.0", "cc-zero", "cc0", "cc0-1.0", "odc-by",
+    "odc-odbl", "odc-pddl", "gfdl", "other-open", "other-pd", "other-at", "uk-ogl", "lla-mx",
+}
+NO_LICENSE = {"", "notspecified", "other-closed"}
+
+FREQUENCY_FIELDS = ("frequency", "frecuencia", "update_frequency", "accrual_periodicity", "accrualPeriodicity")
+# Matched as substrings, longest first, so "biweekly" is not read as "weekly"
+# nor "cuatrimestral" as "trimestral"
+FREQUENCY_DAYS = {
+    "diari": 1, "daily": 1, "semanal": 7, "weekly": 7, "quincenal": 15, "biweekly": 14, "fortnightly": 14,
+    "mensual": 30, "monthly": 30, "bimestral": 61, "trimestral": 91, "quarterly": 91,
+    "cuatrimestral": 122, "semestral": 182, "semianual": 182, "semiannual": 182,
+    "anual": 365, "annual": 365, "yearly": 365,
+}
+_FREQUENCY_WORDS = sorted(FREQUENCY_DAYS.items(), key=lambda item: -len(item[0]))
+ISO_PERIOD_DAYS = {"D": 1, "W": 7, "M": 30, "Y": 365}
+# Assumed update interval of datasets that do not declare a frequency
+DEFAULT_FREQUENCY_DAYS = 365
+
+
+def api_url(page_url: str, base_url: Optional[str] = None) -> str:
+    """package_show URL of a CKAN dataset page (https://host/dataset/<name>)."""
+    parts = urlsplit(page_url)
+    name = parts.path.rstrip("/").split("/dataset/")[-1].split("/")[0]
+    base = (base_url or CKAN_URL or f"{parts.scheme}://{parts.netloc}").rstrip("/")
+    return f"{base}/api/3/action/package_show?id={name}"
+
+
+def package_show(page_url: str, base_url: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Metadata of the dataset behind a CKAN page, or None when the API does not answer with it."""
+    try:
+        response = get_fetcher().get(api_url(page_url, base_url))
+        body = response.json()
+    except (requests.RequestException, ValueError):
+        return None
+    return body.get("result") if body.get("success") else None
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        date = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def _extras(package: Dict[str, Any]) -> Dict[str, Any]:
+    extras = {extra.get("key"): extra.get("value") for extra in package.get("extras") or []}
+    return {**extras, **package}
+
+
+def _formats(resources: List[Dict[str, Any]]) -> set:
+    return {str(resource.get("format") or "").strip(". ").upper() for resource in resources}
+
+
+def frequency_days(package: Dict[str, Any]) -> Optional[int]:
+    """Declared update interval in days, from a frequency field or extra (Spanish, English or ISO 8601)."""
+    fields = _extras(package)
+    value = next((str(fields[name]).lower() for name in FREQUENCY_FIELDS if fields.get(name)), None)
+    if value is None:
+        return None
+    period = re.search(r'p(\d+)([dwmy])', value)
+    if period:
+        return int(period.group(1)) * ISO_PERIOD_DAYS[period.group(2).upper()]
+    return next((days for word, days in _FREQUENCY_WORDS if word in value), None)
+
+
+def last_modified(package: Dict[str, Any]) -> Optional[datetime]:
+    """Latest modification date of the dataset's resources, or of its metadata when they have none."""
+    dates = []
+    for resource in package.get("resources") or []:
+        dates += [_parse_date(resource.get("last_modified")), _parse_date(resource.get("created"))]
+    dates = [date for date in dates if date] or [_parse_date(package.get("metadata_modified"))]
+    return max((date for date in dates if date), default=None)
+
+
+def score_objective_criteria(package: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Scores the objective open data criteria (0-100) from a CKAN package_show result.
+
+    Args:
+        package (dict): The "result" of package_show
+        now (datetime): Reference time for the freshness criteria, defaults to the current time
+
+    Returns:
+        dict: Criterion question to score, for the criteria that metadata can answer
+    """
+    now = now or datetime.now(timezone.utc)
+    resources = [r for r in package.get("resources") or [] if r.get("url") or r.get("datastore_active")]
+    formats = _formats(resources)
+    scores = {EXISTS: 100, ONLINE: 100 if resources else 50}
+
+    if formats & OPEN_FORMATS:
+        scores[MACHINE_READABLE] = 100
+    elif formats & PROPRIETARY_FORMATS:
+        scores[MACHINE_READABLE] = 70
+    else:
+        scores[MACHINE_READABLE] = 0
+
+    readable = [r for r in resources if _formats([r]) & (OPEN_FORMATS | PROPRIETARY_FORMATS)]
+    if any(r.get("url_type") == "upload" or r.get("datastore_active") for r in readable):
+        scores[AS_A_WHOLE] = 100
+    elif readable:
+        # Linked from elsewhere: usually a full file, but it may be a partial export or an API
+        scores[AS_A_WHOLE] = 80
+    else:
+        scores[AS_A_WHOLE] = 0
+
+    # CKAN public datasets are downloaded without payment or registration
+    scores[FREE_OF_CHARGE] = 0 if package.get("private") else 100
+
+    license_id = str(package.get("license_id") or "").lower()
+    if package.get("isopen") or license_id in OPEN_LICENSES:
+        scores[OPEN_LICENSE] = 100
+    elif license_id in NO_LICENSE:
+        scores[OPEN_LICENSE] = 0
+    else:
+        scores[OPEN_LICENSE] = 30
+
+    interval = frequency_days(package)
+    modified = last_modified(package)
+    age = (now - modified).days if modified else None
+    expected = interval or DEFAULT_FREQUENCY_DAYS
+    if age is None or age > 3 * expected:
+        scores[UP_TO_DATE] = 0
+    elif age > 1.5 * expected:
+        scores[UP_TO_DATE] = 50
+    else:
+        scores[UP_TO_DATE] = 100
+
+    if interval:
+        # A declared frequency counts for half, keeping to it for the other half
+        scores[REGULARLY_UPDATED] = 50 + (50 if scores[UP_TO_DATE] == 100 else 0)
+    else:
+        # Without one, resources published in several different months suggest a series
+        months = {date.strftime("%Y-%m") for date in map(_parse_date, (r.get("created") for r in resources)) if date}
+        scores[REGULARLY_UPDATED] = 50 if len(months) >= 3 else 0
+    return scores
@@ -0,0 +1,393 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+import urllib3
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+from .instrumentation import measure_stage
+
+# Set a custom User-Agent to avoid potential blocks
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Bumped whenever extract_text changes its output, so cached pages are re-extracted
+EXTRACTOR_VERSION = "3"
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# CKAN wraps the dataset page (breadcrumb, description, resources and the
+# license sidebar) in <div id="content">; navigation and footer sit outside it
+CONTENT_REGION = SoupStrainer(id="content")
+NON_CONTENT_TAGS = ['script', 'style', 'head', 'title', 'meta', '[document]']
+# Labels of the "Additional info" rows that hold the dataset's last update
+LAST_MODIFIED_LABEL = re.compile(r'actualiza|modifica|updated|modified', re.IGNORECASE)
+
+# Set DQ_PAGE_CACHE to another directory, or to an empty string to disable the page cache
+PAGE_CACHE_DIR = os.environ.get(
+    "DQ_PAGE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "data_quality", "pages")
+)
+
+# The catalog is fetched with verify=False, as before; don't warn on every request
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code, even inside a running loop (e.g. Jupyter)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def clean_text(text: str) -> str:
+    """Collapse every run of whitespace into one space.
+
+    Same result as stripping lines, splitting on double spaces and
+    normalizing with a regex, in a single pass.
+    """
+    return ' '.join(text.split())
+
+
+def _parse_content(html: str, targeted: bool) -> BeautifulSoup:
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=CONTENT_REGION) if targeted else None
+    if soup is None or not soup.contents:
+        soup = BeautifulSoup(html, HTML_PARSER)
+
+    # Remove unwanted elements
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+    return soup
+
+
+def extract_text(html: str, targeted: bool = True) -> str:
+    """
+    Extracts the text content of an HTML document, removing scripts, styles, and other non-content elements.
+
+    Args:
+        html (str): The HTML document
+        targeted (bool): Only build the CKAN content region; pages without one are parsed whole
+
+    Returns:
+        str: Cleaned text content of the document
+    """
+    return clean_text(_parse_content(html, targeted).get_text())
+
+
+def _text_without(element, *excluded) -> str:
+    """Cleaned text of an element, leaving out the text inside the excluded descendants."""
+    excluded = [e for e in excluded if e is not None]
+    return clean_text(" ".join(
+        string for string in element.find_all(string=True)
+        if not any(e in string.parents for e in excluded)
+    ))
+
+
+def extract_sections(soup: BeautifulSoup) -> Dict[str, Any]:
+    """
+    Picks the fields of a CKAN dataset page that matter for its evaluation out of the parsed markup.
+
+    Args:
+        soup (BeautifulSoup): The parsed page
+
+    Returns:
+        dict: title, description, license, last_modified, formats, resources
+            ({"name", "format"} each) and details (label to value of the additional info table).
+            Fields the page does not have are left out.
+    """
+    sections: Dict[str, Any] = {}
+    title = soup.find("h1")
+    if title:
+        sections["title"] = clean_text(title.get_text())
+    notes = soup.select_one(".notes")
+    if notes:
+        sections["description"] = clean_text(notes.get_text())
+
+    license_section = soup.select_one(".license, [rel='dc:rights'], [property='dc:rights']")
+    if license_section:
+        sections["license"] = _text_without(license_section, license_section.find(["h1", "h2", "h3"]))
+
+    resources = []
+    for item in soup.select(".resource-item"):
+        label = item.select_one(".format-label")
+        resource_format = clean_text(label.get("data-format") or label.get_text()).upper() if label else ""
+        heading = item.select_one(".heading") or item
+        name = heading.get("title") or _text_without(heading, label)
+        resources.append({"name": name, "format": resource_format})
+    if resources:
+        sections["resources"] = resources
+        sections["formats"] = sorted({r["format"] for r in resources if r["format"]})
+
+    details = {}
+    for row in soup.select("tr"):
+        label, value = row.find("th"), row.find("td")
+        if label and value:
+            details[clean_text(label.get_text())] = clean_text(value.get_text())
+    if details:
+        sections["details"] = details
+        last_modified = next((value for label, value in details.items() if LAST_MODIFIED_LABEL.search(label)), None)
+        if last_modified:
+            sections["last_modified"] = last_modified
+    return sections
+
+
+def extract_page(html: str, targeted: bool = True) -> Dict[str, Any]:
+    """Cleaned text of a page together with its extract_sections fields, from a single parse."""
+    soup = _parse_content(html, targeted)
+    return {"text": clean_text(soup.get_text()), "sections": extract_sections(soup)}
+
+
+class PageCache:
+    """On-disk store of extracted page content with the validators needed to revalidate it.
+
+    Each URL maps to one JSON file holding the extract_page result and the ETag and
+    Last-Modified headers of the response it came from. Only responses that
+    carry at least one of those headers are stored, since without them the
+    server cannot answer a conditional request with 304 Not Modified.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if entry.get("url") != url or entry.get("extractor") != EXTRACTOR_VERSION:
+            return None
+        return entry
+
+    def put(self, url: str, response: requests.Response, page: Dict[str, Any]) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"url": url, "extractor": EXTRACTOR_VERSION, "etag": etag,
+                       "last_modified": last_modified, "page": page}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers revalidating a cached entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+
+class PageFetcher:
+    """Pooled HTTP client for catalog pages, with a synchronous and an async API.
+
+    A single requests.Session keeps connections alive across calls and its
+    pool holds up to max_connections sockets. Transient failures (connection
+    errors, timeouts, 429 and 5xx answers) are retried with exponential
+    backoff and jitter, honouring Retry-After. The async API runs requests on
+    a thread pool and limits how many run against the same host at once.
+    With a PageCache, pages seen before are revalidated with a conditional
+    request and a 304 answer reuses the stored text without downloading or
+    parsing the page again.
+    """
+
+    def __init__(self, max_connections: int = 20, per_host: int = 4, retries: int = 3,
+                 backoff: float = 0.5, timeout=(5, 30), verify: bool = False,
+                 headers: Optional[Dict[str, str]] = None, cache: Optional[PageCache] = None):
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.verify = verify
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="fetch")
+        # Semaphores belong to the event loop they are used in
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random())
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout=None) -> requests.Response:
+        """GET a URL, retrying transient failures; raises requests.RequestException when out of retries."""
+        with measure_stage("fetch", detail=url):
+            return self._get(url, headers, timeout)
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]], timeout) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout or self.timeout,
+                                            verify=self.verify)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                time.sleep(self._delay(attempt, response))
+                continue
+            response.raise_for_status()
+            return response
+
+    def get_page(self, url: str, timeout=None) -> Dict[str, Any]:
+        """extract_page of a URL, revalidating the cached copy when there is one."""
+        entry = self.cache.get(url) if self.cache else None
+        headers = PageCache.conditional_headers(entry) if entry else None
+        response = self.get(url, headers=headers, timeout=timeout)
+        if entry and response.status_code == 304:
+            return entry["page"]
+        with measure_stage("extract", detail=url):
+            page = extract_page(response.text)
+        if self.cache:
+            self.cache.put(url, response, page)
+        return page
+
+    def get_text(self, url: str, timeout=None) -> str:
+        """Cleaned text of a page, revalidating the cached copy when there is one."""
+        return self.get_page(url, timeout=timeout)["text"]
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        with self._lock:
+            hosts = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+            host = urlsplit(url).netloc
+            if host not in hosts:
+                hosts[host] = asyncio.Semaphore(self.per_host)
+            return hosts[host]
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Async GET limited to per_host concurrent requests per host."""
+        async with self._host_semaphore(url):
+            loop = asyncio.get_running_loop()
+            # Keep context variables (e.g. instrumentation.recording_stages) visible on the thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, functools.partial(context.run, self.get, url, headers))
+
+    async def fetch_text(self, url: str) -> str:
+        """Async get_text, limited like fetch."""
+        async with self._host_semaphore(url):
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, functools.partial(context.run, self.get_text, url))
+
+    async def fetch_many(self, urls: List[str]) -> List[Union[requests.Response, Exception]]:
+        """Fetch many URLs concurrently; failures are returned in place of their response."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+
+    async def fetch_texts(self, urls: List[str]) -> List[str]:
+        """Cleaned text of many pages, with get_webpage_text's "Error: ..." strings for failures."""
+        texts = await asyncio.gather(*(self.fetch_text(url) for url in urls), return_exceptions=True)
+        return [f"Error: Error fetching webpage: {text}" if isinstance(text, Exception) else text
+                for text in texts]
+
+    def close(self) -> None:
+        self.session.close()
+        self._executor.shutdown(wait=False)
+
+
+_default_fetcher: Optional[PageFetcher] = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> PageFetcher:
+    """Process-wide fetcher shared by open_data and standards."""
+    global _default_fetcher
+    if _default_fetcher is None:
+        # One fetcher per process, or the per-host limits are not shared
+        with _default_fetcher_lock:
+            if _default_fetcher is None:
+                _default_fetcher = PageFetcher(cache=PageCache(PAGE_CACHE_DIR) if PAGE_CACHE_DIR else None)
+    return _default_fetcher
+
+
+def extract_webpage_text(url, timeout=30):
+    """
+    Fetches a webpage and extracts its text content, removing scripts, styles, and other non-content elements.
+
+    Args:
+        url (str): The URL of the webpage to fetch
+        timeout (int): Request timeout in seconds
+
+    Returns:
+        str: Cleaned text content of the webpage
+
+    Raises:
+        Exception: If there's an error fetching the webpage
+    """
+    try:
+        return get_fetcher().get_text(url, timeout=timeout)
+    except requests.RequestException as e:
+        raise Exception(f"Error fetching webpage: {str(e)}")
+
+
+def get_webpage_text(url):
+    """
+    Simplified wrapper function for quick text extraction.
+
+    Args:
+        url (str): The URL of the webpage
+
+    Returns:
+        str: Extracted text or error message
+    """
+    try:
+        return extract_webpage_text(url)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def get_webpage_content(url: str, timeout=30) -> Dict[str, Any]:
+    """
+    Like get_webpage_text, but also returns the page's extract_sections fields.
+
+    Args:
+        url (str): The URL of the webpage
+        timeout (int): Request timeout in seconds
+
+    Returns:
+        dict: text (extracted text or error message) and sections (empty when the fetch failed)
+    """
+    try:
+        return get_fetcher().get_page(url, timeout=timeout)
+    except requests.RequestException as e:
+        return {"text": f"Error: Error fetching webpage: {str(e)}", "sections": {}}
+
+
+def get_webpages_text(urls: List[str]) -> List[str]:
+    """Batch get_webpage_text: fetch every page concurrently through the shared fetcher."""
+    return run_sync(get_fetcher().fetch_texts(urls))
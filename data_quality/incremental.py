@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import os
+import pickle
+from typing import Dict, Any, List, Optional, Tuple
+
+from .instrumentation import measure_stage
+from .streaming import StreamingDataQualityAnalyzer
+from .technical import ANALYSIS_VERSION
+
+_BLOCK_SIZE = 1024 * 1024
+_STATE_KEYS = frozenset({"analysis_version", "options", "byte_length", "prefix_digest", "ends_with_newline",
+                         "load_info", "columns", "total_rows", "accumulators"})
+
+logger = logging.getLogger(__name__)
+
+
+def file_digests(file_path: str, prefix_length: int) -> Tuple[str, str]:
+    """SHA-256 of the first prefix_length bytes and of the whole file, in one read."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        remaining = prefix_length
+        while remaining > 0:
+            block = f.read(min(_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        prefix = digest.hexdigest()
+        for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+            digest.update(block)
+    return prefix, digest.hexdigest()
+
+
+class IncrementalDataQualityAnalyzer(StreamingDataQualityAnalyzer):
+    """Streaming analyzer that only reads the rows appended since its last run.
+
+    After every run the per-column accumulators are pickled to state_path
+    together with the byte length and a digest of the file. When the file
+    still starts with exactly those bytes and they ended on a line break,
+    the file only gained rows: the saved accumulators are restored and just
+    the new bytes are parsed and folded in. Any other change, or a different
+    analysis version or option set, triggers a full streaming pass.
+    """
+
+    def __init__(self, file_path: str, state_path: Optional[str] = None, chunksize: int = 100_000,
+                 top_k: Optional[int] = None):
+        """Initialize the analyzer, resuming from saved state when the file only grew."""
+        self.state_path = state_path or f"{file_path}.dq-state.pkl"
+        options = {"chunksize": chunksize, "top_k": top_k}
+        file_size = os.path.getsize(file_path)
+        state = self._load_state(file_path, file_size, options)
+        previous_digest, self._file_digest = file_digests(file_path, state["byte_length"] if state else 0)
+        if state is not None and previous_digest != state["prefix_digest"]:
+            state = None
+
+        if state is None:
+            super().__init__(file_path, chunksize=chunksize, top_k=top_k)
+            self.incremental_info = {"mode": "full", "previous_rows": 0, "appended_rows": self.total_rows}
+        else:
+            self._resume(file_path, state, file_size)
+
+        self._save_state(file_size, options)
+
+    def _load_state(self, file_path: str, file_size: int, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Saved state if it is usable for an append-only update of this file."""
+        try:
+            with open(self.state_path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # A truncated or incompatible pickle can raise nearly anything; re-read the file instead
+            logger.warning("Ignoring unreadable state %s: %s", self.state_path, e)
+            return None
+        if not isinstance(state, dict) or not _STATE_KEYS <= state.keys():
+            logger.warning("Ignoring incomplete state %s", self.state_path)
+            return None
+        if state.get("analysis_version") != ANALYSIS_VERSION or state.get("options") != options:
+            return None
+        if file_size < state["byte_length"] or not state["ends_with_newline"]:
+            return None
+        return state
+
+    def _resume(self, file_path: str, state: Dict[str, Any], file_size: int) -> None:
+        self.file_path = file_path
+        self.chunksize = state["options"]["chunksize"]
+        self.top_k = state["options"]["top_k"]
+        self.workers = 1
+        self.parallel_info = None
+        self.df = None
+        self.timings: List[Dict[str, Any]] = []
+        self.load_info = state["load_info"]
+        self.columns = state["columns"]
+        self.accumulators = state["accumulators"]
+        self.total_rows = previous_rows = state["total_rows"]
+        self.total_columns = len(self.columns)
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._parse_seconds = 0.0
+        self._peak_memory = None
+
+        with measure_stage("load", detail=file_path, sink=self.timings) as timing:
+            if file_size > state["byte_length"]:
+                with open(file_path, "rb") as f:
+                    f.seek(state["byte_length"])
+                    for chunk in self._read_chunks(f, header=None, names=self.columns, skiprows=None):
+                        self.update(chunk)
+            # Only the appended rows were read
+            timing["rows"] = self.total_rows - previous_rows
+        self.load_info.update({
+            "parse_seconds": round(self._parse_seconds, 4),
+            "peak_memory_bytes": self._peak_memory
+        })
+        self.incremental_info = {
+            "mode": "append",
+            "previous_rows": previous_rows,
+            "appended_rows": self.total_rows - previous_rows
+        }
+
+    def _save_state(self, file_size: int, options: Dict[str, Any]) -> None:
+        with open(self.file_path, "rb") as f:
+            f.seek(max(file_size - 1, 0))
+            ends_with_newline = f.read(1) in (b"\n", b"")
+        state = {
+            "analysis_version": ANALYSIS_VERSION,
+            "options": options,
+            "byte_length": file_size,
+            "prefix_digest": self._file_digest,
+            "ends_with_newline": ends_with_newline,
+            "load_info": self.load_info,
+            "columns": self.columns,
+            "total_rows": self.total_rows,
+            "accumulators": self.accumulators
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def report_metadata(self) -> Dict[str, Any]:
+        """Report metadata, recording how much of the file was re-read."""
+        return {**super().report_metadata(), "incremental": self.incremental_info}
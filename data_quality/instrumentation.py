@@ -0,0 +1,107 @@
+import contextvars
+import csv
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TIMING_FIELDS = ("stage", "detail", "wall_seconds", "cpu_seconds", "peak_rss_bytes", "rows", "rows_per_second")
+
+_stage_records: contextvars.ContextVar = contextvars.ContextVar("stage_records", default=None)
+_exporters: List[Callable[[Dict[str, Any]], None]] = []
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Highest resident set size of this process so far, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def add_exporter(exporter: Callable[[Dict[str, Any]], None]) -> None:
+    """Call exporter with every stage record this process makes from now on."""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Callable[[Dict[str, Any]], None]) -> None:
+    _exporters.remove(exporter)
+
+
+def emit(record: Dict[str, Any], sink: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Hand a stage record to sink (or to the active recording_stages list) and to the exporters."""
+    records = sink if sink is not None else _stage_records.get()
+    if records is not None:
+        records.append(record)
+    for exporter in list(_exporters):
+        exporter(record)
+
+
+@contextmanager
+def measure_stage(stage: str, rows: Optional[int] = None, detail: Optional[str] = None,
+                  sink: Optional[List[Dict[str, Any]]] = None):
+    """Record the wall time, CPU time and peak RSS of the block as one stage.
+
+    Yields the record, so rows can be set once they are known. CPU time is
+    that of the current thread; peak RSS is the process's high-water mark
+    when the stage ends. The record goes to sink when given, otherwise to
+    the list of the enclosing recording_stages block, if any.
+    """
+    record: Dict[str, Any] = dict.fromkeys(TIMING_FIELDS)
+    record.update(stage=stage, detail=detail, rows=rows)
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield record
+    finally:
+        wall_seconds = time.perf_counter() - wall_start
+        record.update(
+            wall_seconds=round(wall_seconds, 4),
+            cpu_seconds=round(time.thread_time() - cpu_start, 4),
+            peak_rss_bytes=peak_rss_bytes(),
+            rows_per_second=round(record["rows"] / wall_seconds) if record["rows"] and wall_seconds else None
+        )
+        emit(record, sink)
+
+
+def record_stage(stage: str, wall_seconds: float, detail: Optional[str] = None) -> None:
+    """Record a stage timed elsewhere, such as an LLM call awaited on the scheduler's loop."""
+    record: Dict[str, Any] = dict.fromkeys(TIMING_FIELDS)
+    record.update(stage=stage, detail=detail, wall_seconds=wall_seconds, peak_rss_bytes=peak_rss_bytes())
+    emit(record)
+
+
+@contextmanager
+def recording_stages():
+    """Collect the stage records made inside the block, including from async tasks and stage threads it starts."""
+    records: List[Dict[str, Any]] = []
+    token = _stage_records.set(records)
+    try:
+        yield records
+    finally:
+        _stage_records.reset(token)
+
+
+class CSVExporter:
+    """Appends stage records to a CSV table, one row per stage, with any extra fields given first (e.g. dataset)."""
+
+    def __init__(self, path: str, extra_fields: tuple = ("dataset",)):
+        self.path = path
+        self.fields = tuple(extra_fields) + TIMING_FIELDS
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=self.fields, extrasaction="ignore")
+                if new:
+                    writer.writeheader()
+                writer.writerow(record)
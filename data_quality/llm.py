@@ -0,0 +1,461 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import openai
+
+from .instrumentation import record_stage
+from .prompt_content import count_tokens
+
+# Set DQ_LLM_CACHE to another file, or to an empty string to disable the response cache
+LLM_CACHE_PATH = os.environ.get(
+    "DQ_LLM_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "data_quality", "llm.sqlite")
+)
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+PERPLEXITY_URL = "https://api.perplexity.ai"
+# Requests and tokens per minute allowed on each endpoint (None is OpenAI)
+ENDPOINT_LIMITS = {
+    None: {"rpm": 500, "tpm": 30_000},
+    PERPLEXITY_URL: {"rpm": 50, "tpm": 200_000},
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Completion tokens reserved per request until the actual usage is known
+EXPECTED_COMPLETION_TOKENS = 500
+# Times a reply that fails parsing or validation is sent back for correction
+MAX_CORRECTIONS = 2
+CORRECTION_PROMPT = (
+    "Your previous reply could not be used: {error}. "
+    "Reply again with only the corrected JSON, no code fences and no explanations."
+)
+
+_call_records: contextvars.ContextVar = contextvars.ContextVar("llm_call_records", default=None)
+
+
+class LLMCache:
+    """SQLite store of chat completion answers keyed by model, messages and temperature.
+
+    Entries older than ttl seconds are ignored and purged. Once the stored
+    answers exceed max_bytes the least recently used ones are evicted. The
+    database is opened in WAL mode so batch workers can share one file.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, content TEXT, size INTEGER, created REAL, last_used REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads, nor with forked workers
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.db = sqlite3.connect(self.path, timeout=30)
+            self._local.pid = os.getpid()
+        return self._local.db
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], temperature: Optional[float] = None) -> str:
+        request = {"model": model, "messages": messages, "temperature": temperature}
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached answer for a key, or None when missing or expired."""
+        now = time.time()
+        with self._connection() as db:
+            row = db.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, model: str, content: str) -> None:
+        now = time.time()
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, len(content.encode()), now, now)
+            )
+            db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of entries and stored bytes."""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {"entries": entries, "bytes": size}
+
+
+class TokenBucket:
+    """Rate limiter refilling `rate` units per minute, up to one minute's worth.
+
+    reserve() takes units right away, going into debt if needed, and returns
+    how long the caller must wait before using them; this keeps it safe to
+    share between threads without an event loop of its own.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.level = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.rate, self.level + (now - self.updated) * self.rate / 60)
+            self.updated = now
+            self.level -= min(amount, self.rate)
+            return max(0.0, -self.level * 60 / self.rate)
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self.level = min(self.rate, self.level + amount)
+
+
+class LLMScheduler:
+    """Process-wide scheduler for chat completions against OpenAI-compatible endpoints.
+
+    All calls run on one background event loop with one async client per key
+    and endpoint. Each endpoint has token buckets for requests and tokens per
+    minute and at most max_concurrency requests in flight. 429, 5xx,
+    connection errors and timeouts are retried with jittered exponential
+    backoff, honouring Retry-After. Synchronous callers block on complete();
+    async callers await acomplete().
+    """
+
+    def __init__(self, max_concurrency: int = 8, limits: Optional[Dict[Optional[str], Dict[str, float]]] = None,
+                 retries: int = 5, backoff: float = 1.0, timeout: float = 120):
+        self.max_concurrency = max_concurrency
+        self.limits = limits or ENDPOINT_LIMITS
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._clients: Dict[tuple, openai.AsyncOpenAI] = {}
+        self._buckets: Dict[Optional[str], tuple] = {}
+        self._semaphores: Dict[Optional[str], asyncio.Semaphore] = {}
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="llm-scheduler", daemon=True).start()
+
+    def _client(self, api_key: str, base_url: Optional[str]) -> openai.AsyncOpenAI:
+        if (api_key, base_url) not in self._clients:
+            # Retries are handled here, with the rate limits in mind
+            self._clients[api_key, base_url] = openai.AsyncOpenAI(
+                api_key=api_key, base_url=base_url, max_retries=0, timeout=self.timeout
+            )
+        return self._clients[api_key, base_url]
+
+    def _endpoint(self, base_url: Optional[str]):
+        if base_url not in self._buckets:
+            limits = self.limits.get(base_url, self.limits[None])
+            self._buckets[base_url] = (TokenBucket(limits["rpm"]), TokenBucket(limits["tpm"]))
+            self._semaphores[base_url] = asyncio.Semaphore(self.max_concurrency)
+        return self._buckets[base_url], self._semaphores[base_url]
+
+    def _delay(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.replace(".", "", 1).isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random())
+
+    @staticmethod
+    async def _read_stream(stream, until: Callable[[str], bool]) -> str:
+        pieces = []
+        try:
+            async for chunk in stream:
+                piece = chunk.choices[0].delta.content if chunk.choices else None
+                if piece:
+                    pieces.append(piece)
+                    if until(piece):
+                        # Everything needed has arrived; drop the rest of the answer
+                        break
+        finally:
+            await stream.close()
+        return "".join(pieces)
+
+    async def _complete(self, request: Dict[str, Any], api_key: str, base_url: Optional[str],
+                        make_until: Optional[Callable[[], Callable[[str], bool]]] = None) -> Tuple[str, int]:
+        (requests_bucket, tokens_bucket), semaphore = self._endpoint(base_url)
+        estimate = sum(count_tokens(m["content"]) for m in request["messages"]) + EXPECTED_COMPLETION_TOKENS
+        if make_until is not None:
+            request = {**request, "stream": True}
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                await asyncio.sleep(max(requests_bucket.reserve(1), tokens_bucket.reserve(estimate)))
+                try:
+                    response = await self._client(api_key, base_url).chat.completions.create(**request)
+                    if make_until is not None:
+                        # A fresh predicate per attempt: a retried stream starts over
+                        return await self._read_stream(response, make_until()), attempt + 1
+                except (openai.APIConnectionError, openai.APIStatusError) as e:
+                    retryable = not isinstance(e, openai.APIStatusError) or e.status_code in RETRY_STATUSES
+                    if not retryable or attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self._delay(attempt, e))
+                    continue
+                if response.usage is not None:
+                    tokens_bucket.refund(estimate - response.usage.total_tokens)
+                return response.choices[0].message.content, attempt + 1
+
+    def run(self, coro):
+        """Run a coroutine on the scheduler's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def acomplete(self, request: Dict[str, Any], api_key: str, base_url: Optional[str] = None,
+                        make_until: Optional[Callable[[], Callable[[str], bool]]] = None) -> Tuple[str, int]:
+        """Content of a chat completion and the number of requests it took.
+
+        request holds the keyword arguments of chat.completions.create. With
+        make_until, the answer is streamed and each piece passed to the
+        predicate it returns for that attempt; reading stops as soon as the
+        predicate returns True.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._complete(request, api_key, base_url, make_until), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def complete(self, request: Dict[str, Any], api_key: str, base_url: Optional[str] = None,
+                 make_until: Optional[Callable[[], Callable[[str], bool]]] = None) -> Tuple[str, int]:
+        """Blocking acomplete."""
+        return self.run(self._complete(request, api_key, base_url, make_until))
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_pid: Optional[int] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """The process-wide scheduler, created on first use (and again in forked workers)."""
+    global _scheduler, _scheduler_pid
+    if _scheduler is None or _scheduler_pid != os.getpid():
+        # Threads making their first call at once must share one scheduler and its limits
+        with _scheduler_lock:
+            if _scheduler is None or _scheduler_pid != os.getpid():
+                _scheduler, _scheduler_pid = LLMScheduler(), os.getpid()
+    return _scheduler
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> Optional[LLMCache]:
+    """Process-wide response cache, None when DQ_LLM_CACHE is empty."""
+    return LLMCache(LLM_CACHE_PATH) if LLM_CACHE_PATH else None
+
+
+class JSONStreamParser:
+    """Finds the first complete JSON object or array in text that arrives in pieces.
+
+    Text before it, such as code fences or a preamble, is skipped, so a
+    streamed answer can stop being read as soon as its JSON is complete.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, piece: str) -> bool:
+        """Add the next piece of text; True once the JSON value is complete."""
+        self.text += piece
+        text = self.text
+        while self._position < len(text) and self.end is None:
+            char = text[self._position]
+            if self.start is None:
+                if char in "{[":
+                    self.start, self._depth = self._position, 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = self._position + 1
+            self._position += 1
+        return self.end is not None
+
+    def value(self) -> Any:
+        """The parsed JSON value; raises ValueError while it is missing or incomplete."""
+        if self.start is None:
+            raise ValueError("the reply contains no JSON object or array")
+        if self.end is None:
+            raise ValueError("the reply ends before its JSON is complete")
+        return json.loads(self.text[self.start:self.end])
+
+
+def parse_json(text: str) -> Any:
+    """First JSON object or array in a text."""
+    parser = JSONStreamParser()
+    parser.feed(text)
+    return parser.value()
+
+
+@contextmanager
+def recording_calls():
+    """Collect a record of every LLM call made inside the block, including from async tasks it starts.
+
+    Yields the list the records are appended to: label, model, latency_seconds,
+    requests (including rate-limit and error retries), corrections, cached and ok.
+    """
+    records: List[Dict[str, Any]] = []
+    token = _call_records.set(records)
+    try:
+        yield records
+    finally:
+        _call_records.reset(token)
+
+
+def _record(record: Dict[str, Any]) -> None:
+    records = _call_records.get()
+    if records is not None:
+        records.append(record)
+    record_stage("llm", record["latency_seconds"], detail=record["label"] or record["model"])
+
+
+def _request(messages: List[Dict[str, str]], model: str, temperature: Optional[float]) -> Dict[str, Any]:
+    request = {"model": model, "messages": messages}
+    if temperature is not None:
+        request["temperature"] = temperature
+    return request
+
+
+async def _acontent(messages: List[Dict[str, str]], model: str, api_key: str, base_url: Optional[str],
+                    temperature: Optional[float], use_cache: bool,
+                    make_until: Optional[Callable[[], Callable[[str], bool]]] = None) -> Tuple[str, int]:
+    """Content of a completion from the cache or the scheduler, and the requests it took (0 when cached).
+
+    Fresh answers are not stored: the caller puts them with _cache_answer once they are known to be valid.
+    """
+    cache = get_cache()
+    key = LLMCache.key(model, messages, temperature)
+    if cache is not None and use_cache:
+        content = cache.get(key)
+        if content is not None:
+            return content, 0
+
+    return await get_scheduler().acomplete(_request(messages, model, temperature), api_key, base_url, make_until)
+
+
+def _cache_answer(messages: List[Dict[str, str]], model: str, temperature: Optional[float], content: str) -> None:
+    cache = get_cache()
+    if cache is not None:
+        cache.put(LLMCache.key(model, messages, temperature), model, content)
+
+
+def structured_completion(messages: List[Dict[str, str]], model: str, api_key: str,
+                          validate: Callable[[Any], None], **options) -> Any:
+    """Blocking astructured_completion."""
+    return get_scheduler().run(astructured_completion(messages, model, api_key, validate, **options))
+
+
+async def astructured_completion(messages: List[Dict[str, str]], model: str, api_key: str,
+                                 validate: Callable[[Any], None], base_url: Optional[str] = None,
+                                 temperature: Optional[float] = None, use_cache: bool = True,
+                                 max_corrections: int = MAX_CORRECTIONS, label: Optional[str] = None) -> Any:
+    """
+    JSON value of a chat completion, validated and corrected by the model when needed.
+
+    The answer is streamed and parsed as it arrives; reading stops once its JSON
+    is complete. A reply that is not JSON or that validate rejects (by raising
+    ValueError) is sent back with the error and a request to correct it; only
+    this call is repeated, up to max_corrections times.
+
+    Args:
+        messages (list): Chat messages
+        model (str): Model name
+        api_key (str): API key of the endpoint
+        validate (callable): Raises ValueError describing what is wrong with a parsed value
+        base_url (str): OpenAI-compatible endpoint, defaults to OpenAI
+        temperature (float): Sampling temperature, the endpoint's default when None
+        use_cache (bool): False skips the cache lookup (the fresh answer is still stored)
+        max_corrections (int): Correction rounds before giving up
+        label (str): Name of the call in the recorded call information
+
+    Returns:
+        The validated JSON value
+
+    Raises:
+        ValueError: If the answer is still invalid after max_corrections corrections
+    """
+    start = time.perf_counter()
+    total_requests = correction = 0
+    record: Dict[str, Any] = {"label": label, "model": model}
+    conversation = messages
+    try:
+        for correction in range(max_corrections + 1):
+            content, requests_made = await _acontent(conversation, model, api_key, base_url, temperature,
+                                                     use_cache, make_until=lambda: JSONStreamParser().feed)
+            total_requests += requests_made
+            try:
+                value = parse_json(content)
+                validate(value)
+            except ValueError as e:
+                if correction == max_corrections:
+                    record["error"] = str(e)
+                    raise ValueError(f"{label or model} answer is invalid after {correction} corrections: {e}")
+                conversation = conversation + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": CORRECTION_PROMPT.format(error=e)},
+                ]
+                continue
+            if requests_made:
+                # Only answers that passed validation are reused, and a corrected one
+                # under the original prompt too, which is what the next run asks for
+                _cache_answer(conversation, model, temperature, content)
+                if conversation is not messages:
+                    _cache_answer(messages, model, temperature, content)
+            record["ok"] = True
+            return value
+    except Exception as e:
+        record.setdefault("error", str(e))
+        raise
+    finally:
+        record.update({
+            "latency_seconds": round(time.perf_counter() - start, 3),
+            "requests": total_requests,
+            "corrections": correction,
+            "cached": total_requests == 0,
+            "ok": record.get("ok", False)
+        })
+        _record(record)
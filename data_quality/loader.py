@@ -0,0 +1,192 @@
+import pandas as pd
+import csv
+import io
+import time
+import tracemalloc
+import warnings
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+SAMPLE_BYTES = 64 * 1024
+DELIMITERS = ",;\t|"
+# Read with encoding_errors="replace" when the sniffed encoding fails past the sample
+FALLBACK_ENCODING = "cp1252"
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Pick the encoding of a byte sample: utf-8 when it decodes, else cp1252 or latin-1."""
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return "utf-8-sig"
+    # A sample cut mid-character can end in up to three bytes of a sequence
+    for cut in range(4):
+        try:
+            sample[:len(sample) - cut].decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError as e:
+            if e.start < len(sample) - 4:
+                break
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _sniff_delimiter(lines) -> str:
+    """Delimiter that splits the most lines into the same number of fields."""
+    best, best_score = ",", (0, 0)
+    for delimiter in DELIMITERS:
+        field_counts = Counter(len(row) for row in csv.reader(lines, delimiter=delimiter))
+        fields, lines_matching = field_counts.most_common(1)[0] if field_counts else (0, 0)
+        if fields > 1 and (lines_matching, fields) > best_score:
+            best, best_score = delimiter, (lines_matching, fields)
+    return best
+
+
+def _find_header_row(lines, delimiter: str) -> int:
+    """Index of the first line with the most common field count (skips title rows)."""
+    field_counts = [len(row) for row in csv.reader(lines, delimiter=delimiter)]
+    if not field_counts:
+        return 0
+    expected = Counter(field_counts).most_common(1)[0][0]
+    return next(i for i, count in enumerate(field_counts) if count == expected)
+
+
+def sniff_csv(file_path: str, sample_bytes: int = SAMPLE_BYTES) -> Dict[str, Any]:
+    """Infer encoding, delimiter, header row and dtype hints from the head of a CSV file."""
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    truncated = len(sample) == sample_bytes
+    encoding = detect_encoding(sample)
+    text = sample.decode(encoding, errors="ignore")
+    if truncated and "\n" in text:
+        # Drop the partial last line
+        text = text[:text.rfind("\n") + 1]
+
+    lines = text.splitlines()
+    delimiter = _sniff_delimiter(lines)
+    header_row = _find_header_row(lines, delimiter)
+
+    try:
+        sample_df = pd.read_csv(io.StringIO("\n".join(lines[header_row:])), sep=delimiter)
+        dtype_hints = {str(col): str(dtype) for col, dtype in sample_df.dtypes.items()}
+    except (pd.errors.ParserError, pd.errors.EmptyDataError):
+        dtype_hints = {}
+
+    return {
+        "encoding": encoding,
+        # Without non-ASCII bytes in the sample the encoding is only a guess
+        "encoding_confident": not sample.isascii(),
+        "delimiter": delimiter,
+        "header_row": header_row,
+        "dtype_hints": dtype_hints
+    }
+
+
+def csv_read_options(sniffed: Dict[str, Any]) -> Dict[str, Any]:
+    """pd.read_csv keyword arguments for a sniffed file."""
+    options = {
+        "encoding": sniffed["encoding"],
+        "sep": sniffed["delimiter"],
+        "skiprows": sniffed["header_row"] or None,
+    }
+    # Text columns stay text whatever the rest of the file holds, so they skip
+    # inference; numeric hints could be contradicted by a later row
+    text_columns = {col: str for col, dtype in sniffed["dtype_hints"].items() if dtype == "object"}
+    if text_columns:
+        options["dtype"] = text_columns
+    return options
+
+
+def _resolve_engine(engine: Optional[str]) -> Optional[str]:
+    if engine == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            warnings.warn("pyarrow is not installed; falling back to the default CSV engine.")
+            return None
+    return engine
+
+
+def load_table(file_path: str, engine: Optional[str] = None, track_memory: bool = True,
+               columns: Optional[Iterable[str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Read a CSV or Excel file in a single parse, optionally only some of its columns.
+
+    Returns the DataFrame and the load metadata: sniffed settings, the engine
+    used, parse time in seconds and the peak memory allocated while parsing.
+    """
+    if file_path.endswith('.csv'):
+        load_info = sniff_csv(file_path)
+        engine = _resolve_engine(engine)
+        options = {**csv_read_options(load_info), "engine": engine}
+        reader = pd.read_csv
+    elif file_path.endswith(('.xlsx', '.xls')):
+        load_info = {}
+        engine = "excel"
+        options = {}
+        reader = pd.read_excel
+    else:
+        raise ValueError("Unsupported file format. Please use CSV or Excel files.")
+    if columns is not None:
+        options["usecols"] = list(columns)
+
+    # Only tracing started here is stopped here
+    tracing = track_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    peak_memory = None
+    start = time.perf_counter()
+    try:
+        try:
+            df = reader(file_path, **options)
+        except UnicodeDecodeError:
+            if reader is not pd.read_csv:
+                raise
+            # A legacy byte past the sample (mixed-encoding exports), or an ASCII-only
+            # sample that could not tell utf-8 from a legacy encoding
+            load_info["encoding"] = options["encoding"] = FALLBACK_ENCODING
+            df = reader(file_path, encoding_errors="replace", **options)
+        parse_seconds = time.perf_counter() - start
+        if tracing:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+    load_info.update({
+        "engine": engine or "c",
+        "parse_seconds": round(parse_seconds, 4),
+        "peak_memory_bytes": peak_memory
+    })
+    return df, load_info
+
+
+def compact_dtypes(df: pd.DataFrame, max_category_ratio: float = 0.5) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Convert low-cardinality text columns to categoricals and shrink integer columns.
+
+    Categories keep the order in which values first appear, so counts taken
+    on the category codes come out in the same order as value_counts on the
+    original column. Returns the converted frame and a summary with the new
+    dtypes and the memory footprint before and after.
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == 'object':
+            codes, uniques = pd.factorize(series)
+            if len(uniques) <= max_category_ratio * len(series):
+                df[col] = pd.Categorical.from_codes(codes, uniques)
+                converted[col] = "category"
+        elif pd.api.types.is_integer_dtype(series) and len(series):
+            downcast = "unsigned" if series.min() >= 0 else "integer"
+            compacted = pd.to_numeric(series, downcast=downcast)
+            if compacted.dtype != series.dtype:
+                df[col] = compacted
+                converted[col] = str(compacted.dtype)
+
+    return df, {
+        "converted": converted,
+        "memory_before_bytes": memory_before,
+        "memory_after_bytes": int(df.memory_usage(deep=True).sum())
+    }
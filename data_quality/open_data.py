@@ -1,114 +1,89 @@
-import requests
-from bs4 import BeautifulSoup
-import re
-import openai
 import json
+from functools import partial
 
+from .ckan import package_show, score_objective_criteria
+from .fetch import get_webpage_content
+from .llm import structured_completion
+from .prompt_content import DEFAULT_TOKEN_BUDGET, build_prompt_content
 
-def extract_webpage_text(url, timeout=30):
+
+CRITERIA = [
+    "Does the data exist?",
+    "Is it available online from government in any form?",
+    "Is the dataset provided in machine-readable and reusable formats?",
+    "Is the machine-readable and reusable data available as a whole?",
+    "Is the dataset available free of charge?",
+    "Is the data openly licensed?",
+    "Is the dataset up to date?",
+    "Is the dataset being kept regularly updated?",
+    "Was it easy to find information about this dataset?",
+    "Are data identifiers provided for key elements in the dataset?",
+]
+
+EXAMPLE_SCORES = dict.fromkeys(CRITERIA[:8], 100)
+EXAMPLE_SCORES.update({CRITERIA[8]: 85, CRITERIA[9]: 90})
+EXAMPLE_ANALYSIS = "The website is an official government site of the State of Nuevo Le\u00f3n which contains datasets including detailed information about public servants. The data is available in a reusable and machine-readable format (CSV). It looks like the data is kept updated regularly, with the last update timestamp visible. Data is provided free of charge and is openly licensed. Information about the dataset was somewhat easily found but could be presented in a clearer way. There was some evidence of data identifiers being used, though further examination would be needed to ascertain the comprehensiveness of these identifiers."
+
+
+def validate_grading(result, criteria=CRITERIA) -> None:
     """
-    Fetches a webpage and extracts its text content, removing scripts, styles, and other non-content elements.
-    
+    Checks the shape of an open data grading.
+
     Args:
-        url (str): The URL of the webpage to fetch
-        timeout (int): Request timeout in seconds
-        
-    Returns:
-        str: Cleaned text content of the webpage
-    
+        result: Parsed LLM answer
+        criteria (list): Criteria that must have a score
+
     Raises:
-        requests.RequestException: If there's an error fetching the webpage
+        ValueError: Describing the first problem found
     """
-    try:
-        # Set a custom User-Agent to avoid potential blocks
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Fetch the webpage
-        response = requests.get(url, headers=headers, timeout=timeout, verify=False)
-        response.raise_for_status()
-        
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'head', 'title', 'meta', '[document]']):
-            element.decompose()
-            
-        # Get text and clean it
-        text = soup.get_text()
-        
-        # Clean the extracted text
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Remove extra whitespace and normalize spaces
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
-        
-    except requests.RequestException as e:
-        raise Exception(f"Error fetching webpage: {str(e)}")
-
-def get_webpage_text(url):
-    """
-    Simplified wrapper function for quick text extraction.
-    
-    Args:
-        url (str): The URL of the webpage
-    
-    Returns:
-        str: Extracted text or error message
-    """
-    try:
-        return extract_webpage_text(url)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    if not isinstance(result, dict):
+        raise ValueError("expected a JSON object with the fields scores and analysis")
+    scores = result.get("scores")
+    if not isinstance(scores, dict):
+        raise ValueError('"scores" must be an object mapping each criterion to its score')
+    missing = [criterion for criterion in criteria if criterion not in scores]
+    if missing:
+        raise ValueError(f'"scores" is missing these criteria: {missing}')
+    invalid = [criterion for criterion in criteria
+               if isinstance(scores[criterion], bool) or not isinstance(scores[criterion], (int, float))
+               or not 0 <= scores[criterion] <= 100]
+    if invalid:
+        raise ValueError(f"scores must be numbers from 0 to 100, check: {invalid}")
+    if not isinstance(result.get("analysis"), str):
+        raise ValueError('"analysis" must be a string')
 
-    
-def evaluate_dataset_page(page_content: str, api_key: str) -> dict:
-    client = openai.OpenAI(api_key=api_key)
-    
-    prompt = """Evaluate the following dataset webpage content against these criteria, providing a score from 0-100 for each:
-
-1. Does the data exist?
-2. Is it available online from government in any form?
-3. Is the dataset provided in machine-readable and reusable formats?
-4. Is the machine-readable and reusable data available as a whole?
-5. Is the dataset available free of charge?
-6. Is the data openly licensed?
-7. Is the dataset up to date?
-8. Is the dataset being kept regularly updated?
-9. Was it easy to find information about this dataset?
-10. Are data identifiers provided for key elements in the dataset?
+
+def evaluate_dataset_page(page_content: str, api_key: str, criteria=CRITERIA, known_scores=None,
+                          use_cache=True) -> dict:
+    criteria_list = "\n".join(f"{i}. {criterion}" for i, criterion in enumerate(criteria, 1))
+    example = json.dumps({
+        "scores": {criterion: EXAMPLE_SCORES[criterion] for criterion in criteria},
+        "analysis": EXAMPLE_ANALYSIS
+    }, indent=2)
+    context = ""
+    if known_scores:
+        context = ("These criteria were already scored from the catalog metadata; take them into account in the analysis but do not score them again:\n"
+                   + json.dumps(known_scores, indent=2) + "\n\n")
+
+    prompt = f"""Evaluate the following dataset webpage content against these criteria, providing a score from 0-100 for each:
+
+{criteria_list}
 
 Provide your response in JSON format with criteria as keys and scores as values, plus a brief analysis. Include only these fields: scores (object with criteria and their scores), analysis (string with key findings). in a response that resembles 
 
-{
-  "scores": {
-    "Does the data exist?": 100,
-    "Is it available online from government in any form?": 100,
-    "Is the dataset provided in machine-readable and reusable formats?": 100,
-    "Is the machine-readable and reusable data available as a whole?": 100,
-    "Is the dataset available free of charge?": 100,
-    "Is the data openly licensed?": 100,
-    "Is the dataset up to date?": 100,
-    "Is the dataset being kept regularly updated?": 100,
-    "Was it easy to find information about this dataset?": 85,
-    "Are data identifiers provided for key elements in the dataset?": 90
-  },
-  "analysis": "The website is an official government site of the State of Nuevo Le\u00f3n which contains datasets including detailed information about public servants. The data is available in a reusable and machine-readable format (CSV). It looks like the data is kept updated regularly, with the last update timestamp visible. Data is provided free of charge and is openly licensed. Information about the dataset was somewhat easily found but could be presented in a clearer way. There was some evidence of data identifiers being used, though further examination would be needed to ascertain the comprehensiveness of these identifiers."
-}
-
-
-
-Webpage content:
+{example}
+
+
+
+{context}Webpage content:
 """
 
-    response = client.chat.completions.create(
+    return structured_completion(
         model="gpt-4",
+        api_key=api_key,
+        use_cache=use_cache,
+        validate=partial(validate_grading, criteria=criteria),
+        label="open_data",
         messages=[
             {
                 "role": "system",
@@ -121,13 +96,32 @@ Webpage content:
         ]
     )
     
-    return json.loads(response.choices[0].message.content)
-    
-def evaluate(url):
-    
-    content = get_webpage_text(url)
-    
-    page_content = """**Skip to main content**...""" + content # Your provided content
+def evaluate(url, max_tokens=DEFAULT_TOKEN_BUDGET, ckan_url=None, use_cache=True):
+    """
+    Grades a dataset page against the open data criteria.
+
+    Criteria that CKAN metadata can answer are scored locally from package_show;
+    the LLM only scores the rest. When the catalog API is not reachable every
+    criterion goes to the LLM, as before.
+
+    Args:
+        url (str): The dataset page URL
+        max_tokens (int): Token budget of the page content sent to the LLM
+        ckan_url (str): CKAN base URL for package_show, defaults to the page's host
+        use_cache (bool): False asks the LLM again instead of reusing a cached answer
+
+    Returns:
+        dict: scores (all criteria, in CRITERIA order), analysis and scored_locally (criteria not sent to the LLM)
+    """
+    package = package_show(url, ckan_url)
+    known_scores = score_objective_criteria(package) if package else {}
+    pending = [criterion for criterion in CRITERIA if criterion not in known_scores]
+
+    page_content = build_prompt_content(get_webpage_content(url), max_tokens=max_tokens)
 
-    result = evaluate_dataset_page(page_content, "{API_KEY}")
+    result = evaluate_dataset_page(page_content, "{API_KEY}", criteria=pending, known_scores=known_scores,
+                                   use_cache=use_cache)
+    scores = {**result.get("scores", {}), **known_scores}
+    result["scores"] = {criterion: scores[criterion] for criterion in CRITERIA if criterion in scores}
+    result["scored_locally"] = list(known_scores)
     return result
\ No newline at end of file
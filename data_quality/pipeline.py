@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import Executor
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+CPU = "cpu"
+IO = "io"
+
+
+class Stage:
+    """One step of a dataset's evaluation.
+
+    func is called with the results of the stages named in `after`, in that
+    order. CPU stages run in the process pool given to run_stages, so their
+    function and arguments must be picklable; I/O stages run as async tasks,
+    either awaiting func when it is a coroutine function or running it on a
+    thread.
+    """
+
+    def __init__(self, name: str, func: Callable, after: Iterable[str] = (), kind: str = IO):
+        if kind not in (CPU, IO):
+            raise ValueError(f"Unknown stage kind {kind!r}; use 'cpu' or 'io'.")
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.kind = kind
+
+
+async def run_stages(stages: List[Stage], cpu_executor: Optional[Executor] = None,
+                     io_executor: Optional[Executor] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run a stage graph, starting every stage as soon as the stages it depends on are done.
+
+    Stages must be listed after the stages they depend on. Without a
+    cpu_executor, CPU stages run on a thread like I/O stages. If a stage
+    fails, the stages still running are cancelled and the error is raised.
+
+    Returns the result and the wall time in seconds of each stage.
+    """
+    names = set()
+    for stage in stages:
+        unknown = [name for name in stage.after if name not in names]
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} depends on {unknown}, which must be listed before it.")
+        names.add(stage.name)
+
+    loop = asyncio.get_running_loop()
+    tasks: Dict[str, asyncio.Future] = {}
+    seconds: Dict[str, float] = {}
+
+    async def run(stage: Stage):
+        inputs = [await tasks[name] for name in stage.after]
+        start = time.perf_counter()
+        if stage.kind == CPU and cpu_executor is not None:
+            result = await loop.run_in_executor(cpu_executor, stage.func, *inputs)
+        elif asyncio.iscoroutinefunction(stage.func):
+            result = await stage.func(*inputs)
+        else:
+            # Keep context variables (e.g. llm.recording_calls) visible on the thread
+            context = contextvars.copy_context()
+            result = await loop.run_in_executor(io_executor, functools.partial(context.run, stage.func, *inputs))
+        seconds[stage.name] = round(time.perf_counter() - start, 3)
+        return result
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return {name: task.result() for name, task in tasks.items()}, seconds
@@ -0,0 +1,132 @@
+import math
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGET = 1500
+TOKENIZER_ENCODING = "cl100k_base"
+# Without tiktoken, assume a token every 3 characters: Spanish text runs a
+# little under 4, so the estimate errs on the side of staying within budget
+CHARS_PER_TOKEN = 3
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception:
+        # The encoding file could not be loaded (e.g. offline on first use)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in a text: exact with tiktoken, estimated from its length otherwise."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text down to at most max_tokens tokens, marking the cut with an ellipsis."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    # Leave room for the ellipsis
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens - 1]).rstrip() + "…"
+    return text[:(max_tokens - 1) * CHARS_PER_TOKEN].rstrip() + "…"
+
+
+class _Budget:
+    """Lines of the prompt content and the tokens they have used so far."""
+
+    def __init__(self, max_tokens: int):
+        self.remaining = max_tokens
+        self.lines: List[str] = []
+
+    def add(self, line: str) -> bool:
+        # Each line costs its tokens plus the line break joining it
+        tokens = count_tokens(line) + 1
+        if tokens > self.remaining:
+            return False
+        self.lines.append(line)
+        self.remaining -= tokens
+        return True
+
+    def add_truncated(self, prefix: str, text: str) -> None:
+        text = truncate_to_tokens(text, self.remaining - count_tokens(prefix) - 1)
+        if text:
+            self.add(prefix + text)
+
+    def add_list(self, heading: str, items: Iterable[str]) -> None:
+        items = list(items)
+        start = (len(self.lines), self.remaining)
+        if not items or not self.add(heading):
+            return
+        for shown, item in enumerate(items):
+            # Keep room to say how many items did not fit
+            if self.remaining <= 10 or not self.add(f"- {item}"):
+                if not self.add(f"- … {len(items) - shown} more") and not shown:
+                    # Not even the count fits: drop the bare heading
+                    del self.lines[start[0]:]
+                    self.remaining = start[1]
+                return
+
+
+def build_prompt_content(page: Dict[str, Any], columns: Optional[Iterable[str]] = None,
+                         max_tokens: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """
+    Condenses a fetched dataset page into the content an LLM evaluation needs, within a token budget.
+
+    The fields go in order of importance: title, license, formats, last modified date,
+    the dataset's column names, the resource list, the remaining details of the page,
+    and finally the description (or the page text when there is none). Lists are cut
+    when the budget runs out and the description is truncated to whatever is left.
+    Pages without recognizable CKAN fields (or failed fetches) fall back to their
+    text, truncated to the budget.
+
+    Args:
+        page (dict): Result of fetch.get_webpage_content, with text and sections
+        columns (iterable): Column names of the dataset, if known
+        max_tokens (int): Token budget for the returned content
+
+    Returns:
+        str: The condensed page content
+    """
+    sections = page.get("sections") or {}
+    budget = _Budget(max_tokens)
+
+    for label, key in (("Title", "title"), ("License", "license"), ("Formats", "formats"),
+                       ("Last modified", "last_modified")):
+        if sections.get(key):
+            value = sections[key]
+            budget.add(f"{label}: {', '.join(value) if isinstance(value, list) else value}")
+    if columns is not None:
+        budget.add_truncated("Columns: ", ", ".join(str(col) for col in columns))
+
+    budget.add_list("Resources:", (
+        f"{resource['name']} ({resource['format']})" if resource["format"] else resource["name"]
+        for resource in sections.get("resources", [])
+    ))
+    budget.add_list("Details:", (
+        f"{label}: {value}" for label, value in sections.get("details", {}).items()
+        if value != sections.get("last_modified")
+    ))
+
+    if sections.get("description"):
+        budget.add_truncated("Description: ", sections["description"])
+    elif not sections:
+        budget.add_truncated("", page.get("text", ""))
+    else:
+        # An unusual page layout: let its text fill what is left
+        budget.add_truncated("Page text: ", page.get("text", ""))
+    return "\n".join(budget.lines)
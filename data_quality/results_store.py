@@ -0,0 +1,224 @@
+"""Queryable SQLite store of evaluation results.
+
+Usage:
+    python -m data_quality.results_store results.sqlite evaluation_data.json
+    python -m data_quality.results_store results.sqlite results/
+
+Every evaluation (a technical report, optionally with its standards_match and
+open_data_grading) is split into narrow, indexed tables, so a question such as
+"which datasets failed completeness" reads a handful of rows instead of every
+report:
+
+    SELECT dataset, score FROM checks WHERE check_name = 'completeness' AND NOT threshold_met
+
+Value distributions, by far the largest part of a report, live in their own
+value_counts table and are only read when asked for.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+# Per-column maps of value to count, kept out of column_metrics
+VALUE_MAPS = ("value_distribution", "duplicate_values")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS datasets ("
+    "dataset TEXT PRIMARY KEY, url TEXT, filename TEXT, evaluated_at TEXT, analysis_version TEXT, "
+    "total_rows INTEGER, total_columns INTEGER, overall_score REAL, overall_grade TEXT)",
+    "CREATE TABLE IF NOT EXISTS checks ("
+    "dataset TEXT, check_name TEXT, score REAL, interpretation TEXT, threshold_met INTEGER, "
+    "PRIMARY KEY (dataset, check_name))",
+    "CREATE INDEX IF NOT EXISTS checks_by_result ON checks (check_name, threshold_met, score)",
+    # Dataset-level metrics have an empty column_name; nested metrics use dotted names (length_stats.max_length)
+    "CREATE TABLE IF NOT EXISTS column_metrics ("
+    "dataset TEXT, check_name TEXT, column_name TEXT, metric TEXT, value REAL, text TEXT, "
+    "PRIMARY KEY (dataset, check_name, column_name, metric)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS column_metrics_by_metric ON column_metrics (check_name, metric, value)",
+    "CREATE TABLE IF NOT EXISTS validations ("
+    "dataset TEXT, check_name TEXT, name TEXT, success INTEGER, unexpected_count INTEGER, "
+    "unexpected_percent REAL, PRIMARY KEY (dataset, check_name, name)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS validations_by_result ON validations (check_name, success)",
+    "CREATE TABLE IF NOT EXISTS value_counts ("
+    "dataset TEXT, check_name TEXT, column_name TEXT, distribution TEXT, value TEXT, count INTEGER, "
+    "PRIMARY KEY (dataset, check_name, column_name, distribution, value)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS standards ("
+    "dataset TEXT, rank INTEGER, standard TEXT, match_grade TEXT, dataset_link TEXT, score REAL, "
+    "PRIMARY KEY (dataset, rank))",
+    "CREATE INDEX IF NOT EXISTS standards_by_grade ON standards (standard, match_grade)",
+    "CREATE TABLE IF NOT EXISTS open_data ("
+    "dataset TEXT, criterion TEXT, score REAL, PRIMARY KEY (dataset, criterion))",
+    "CREATE INDEX IF NOT EXISTS open_data_by_score ON open_data (criterion, score)",
+    "CREATE TABLE IF NOT EXISTS timings ("
+    "dataset TEXT, seq INTEGER, stage TEXT, detail TEXT, wall_seconds REAL, cpu_seconds REAL, "
+    "peak_rss_bytes INTEGER, rows INTEGER, rows_per_second REAL, PRIMARY KEY (dataset, seq))",
+    "CREATE INDEX IF NOT EXISTS timings_by_stage ON timings (stage, wall_seconds)",
+)
+TABLES = ("datasets", "checks", "column_metrics", "validations", "value_counts", "standards", "open_data",
+          "timings")
+
+
+def _flatten(metrics: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def _value(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    # Numbers (and booleans) go to the indexed value column, anything else to text
+    if isinstance(value, (int, float)):
+        return float(value), None
+    return None, None if value is None else str(value)
+
+
+class ResultsStore:
+    """SQLite database of evaluation results, one row per dataset, check, column and metric.
+
+    add() replaces everything stored for a dataset, so loading a result again
+    after re-running its evaluation keeps the store current. The database is
+    opened in WAL mode so dashboards can read it while a batch writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                db.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads, nor with forked workers
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.db = sqlite3.connect(self.path, timeout=30)
+            self._local.pid = os.getpid()
+        return self._local.db
+
+    def add(self, evaluation: Dict[str, Any], dataset: Optional[str] = None, url: Optional[str] = None) -> None:
+        """
+        Stores one dataset's evaluation, replacing what was stored for it.
+
+        Args:
+            evaluation (dict): A technical report, with standards_match and open_data_grading when evaluated
+            dataset (str): Key of the dataset, e.g. its catalog file; defaults to the report's filename
+            url (str): The dataset page URL
+        """
+        metadata = evaluation.get("metadata", {})
+        overall = evaluation.get("overall_quality", {})
+        dataset = dataset or metadata.get("filename")
+        checks, metrics, validations, value_counts = [], [], [], []
+        columns = set(metadata.get("columns", []))
+        for check, result in evaluation.get("quality_checks", {}).items():
+            grade = result.get("grade", {})
+            checks.append((dataset, check, grade.get("score"), grade.get("interpretation"),
+                           grade.get("threshold_met")))
+            for name, value in result.get("metrics", {}).items():
+                if not isinstance(value, dict):
+                    metrics.append((dataset, check, "", name, *_value(value)))
+                elif name not in columns:
+                    # A map of column to value, e.g. null_counts_by_column
+                    metrics += [(dataset, check, column, name, *_value(v)) for column, v in value.items()]
+                else:
+                    for metric, metric_value in value.items():
+                        if metric in VALUE_MAPS:
+                            value_counts += [(dataset, check, name, metric, str(v), count)
+                                             for v, count in metric_value.items()]
+                        elif isinstance(metric_value, dict):
+                            metrics += [(dataset, check, name, nested, *_value(v))
+                                        for nested, v in _flatten(metric_value, f"{metric}.")]
+                        else:
+                            metrics.append((dataset, check, name, metric, *_value(metric_value)))
+            validations += [(dataset, check, name, v.get("success"), v.get("unexpected_count"),
+                             v.get("unexpected_percent")) for name, v in result.get("validations", {}).items()]
+
+        standards = [(dataset, rank, s.get("standard"), s.get("match_grade"), s.get("dataset_link"), s.get("score"))
+                     for rank, s in enumerate(evaluation.get("standards_match") or []) if isinstance(s, dict)]
+        grading = evaluation.get("open_data_grading") or {}
+        open_data = [(dataset, criterion, score) for criterion, score in (grading.get("scores") or {}).items()]
+        timings = [(dataset, seq, t.get("stage"), t.get("detail"), t.get("wall_seconds"), t.get("cpu_seconds"),
+                    t.get("peak_rss_bytes"), t.get("rows"), t.get("rows_per_second"))
+                   for seq, t in enumerate(metadata.get("timings") or [])]
+
+        with self._connection() as db:
+            for table in TABLES:
+                db.execute(f"DELETE FROM {table} WHERE dataset = ?", (dataset,))
+            db.execute("INSERT INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                dataset, url, metadata.get("filename"), metadata.get("timestamp"), metadata.get("analysis_version"),
+                metadata.get("total_rows"), metadata.get("total_columns"), overall.get("score"), overall.get("grade")
+            ))
+            db.executemany("INSERT INTO checks VALUES (?, ?, ?, ?, ?)", checks)
+            db.executemany("INSERT OR REPLACE INTO column_metrics VALUES (?, ?, ?, ?, ?, ?)", metrics)
+            db.executemany("INSERT OR REPLACE INTO validations VALUES (?, ?, ?, ?, ?, ?)", validations)
+            db.executemany("INSERT OR REPLACE INTO value_counts VALUES (?, ?, ?, ?, ?, ?)", value_counts)
+            db.executemany("INSERT INTO standards VALUES (?, ?, ?, ?, ?, ?)", standards)
+            db.executemany("INSERT OR REPLACE INTO open_data VALUES (?, ?, ?)", open_data)
+            db.executemany("INSERT INTO timings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", timings)
+
+    def add_all(self, evaluations: Dict[str, Dict[str, Any]]) -> None:
+        """Stores a {dataset: evaluation} mapping, such as the notebooks' all_data or a combined batch file."""
+        for dataset, evaluation in evaluations.items():
+            self.add(evaluation, dataset)
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> pd.DataFrame:
+        """Runs a read query and returns its rows as a DataFrame."""
+        return pd.read_sql_query(sql, self._connection(), params=tuple(params))
+
+    def failed_checks(self, check: Optional[str] = None) -> pd.DataFrame:
+        """Datasets whose check grade misses its threshold, worst first (every check when None)."""
+        sql = "SELECT dataset, check_name, score, interpretation FROM checks WHERE NOT threshold_met"
+        if check is not None:
+            return self.query(sql + " AND check_name = ? ORDER BY score", (check,))
+        return self.query(sql + " ORDER BY check_name, score")
+
+    def column_metric(self, check: str, metric: str) -> pd.DataFrame:
+        """One metric of one check across every column of every dataset."""
+        return self.query(
+            "SELECT dataset, column_name, value, text FROM column_metrics WHERE check_name = ? AND metric = ?",
+            (check, metric)
+        )
+
+    def value_counts(self, dataset: str, column: str, distribution: str = "value_distribution") -> pd.Series:
+        """A column's value distribution (or duplicate_values), most frequent first."""
+        frame = self.query(
+            "SELECT value, count FROM value_counts WHERE dataset = ? AND column_name = ? AND distribution = ? "
+            "ORDER BY count DESC", (dataset, column, distribution)
+        )
+        return frame.set_index("value")["count"]
+
+
+def load(store: ResultsStore, path: str) -> int:
+    """Loads a {dataset: evaluation} JSON file, or a directory of per-dataset result files; returns the count."""
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.endswith(".json"))
+        for name in names:
+            with open(os.path.join(path, name)) as f:
+                store.add(json.load(f), dataset=name[:-len(".json")])
+        return len(names)
+    with open(path) as f:
+        evaluations = json.load(f)
+    store.add_all(evaluations)
+    return len(evaluations)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load evaluation results into a queryable SQLite store.")
+    parser.add_argument("database", help="SQLite file to create or update")
+    parser.add_argument("results", nargs="+", help="evaluation_data.json-style files or batch output directories")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.database)
+    for path in args.results:
+        print(f"{path}: {load(store, path)} datasets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import json
+from datetime import date, datetime
+from typing import Any, IO
+
+import numpy as np
+import pandas as pd
+
+# Containers nested deeper than this are encoded in one piece; above it,
+# dump_json writes them item by item. Four levels reach the per-column
+# entries of a report (report -> quality_checks -> check -> metrics -> column).
+STREAM_DEPTH = 4
+
+NATIVE_TYPES = (str, int, float, bool, type(None))
+_EXACT_NATIVE = frozenset(NATIVE_TYPES)
+
+_encoder = json.JSONEncoder()
+
+
+def to_native(obj: Any) -> Any:
+    """
+    Copy of a report with numpy and pandas values turned into the types json writes natively.
+
+    numpy scalars become their Python equivalent (np.bool_ a real bool, not the
+    string "true"), arrays and Series become lists, timestamps ISO strings and
+    missing values (pd.NA, NaT) None. Dictionary keys get the same treatment.
+    Anything else becomes its string.
+
+    Args:
+        obj: A report, or any value in one
+
+    Returns:
+        The value built from dict, list, str, int, float, bool and None only
+    """
+    if type(obj) in _EXACT_NATIVE:
+        return obj
+    # Native keys and values are checked inline: most of a report already is
+    if isinstance(obj, dict):
+        return {key if type(key) in _EXACT_NATIVE else _native_key(key):
+                value if type(value) in _EXACT_NATIVE else to_native(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [value if type(value) in _EXACT_NATIVE else to_native(value) for value in obj]
+    if isinstance(obj, (np.bool_, np.number)):
+        return obj.item()
+    if isinstance(obj, (np.ndarray, pd.Series, pd.Index)):
+        return [to_native(value) for value in obj.tolist()]
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else pd.Timestamp(obj).isoformat()
+    if isinstance(obj, NATIVE_TYPES):
+        # Subclasses (np.str_, enums) that json already writes as their base type
+        return obj
+    return str(obj)
+
+
+def _native_key(key: Any) -> Any:
+    key = to_native(key)
+    # json only takes scalar keys; lists (e.g. from a tuple key) go by their string
+    return key if isinstance(key, NATIVE_TYPES) else str(key)
+
+
+def dump_json(obj: Any, fp: IO[str], depth: int = STREAM_DEPTH) -> None:
+    """
+    Write native-typed data as JSON without holding the whole document in memory.
+
+    The output is the same as json.dump's, but the C encoder runs on one nested
+    entry at a time, so the largest string in memory is that of the biggest
+    entry instead of the full report.
+
+    Args:
+        obj: Data made of native types, e.g. the result of to_native
+        fp: Text file to write to
+        depth: Nesting levels to write item by item
+    """
+    if depth <= 0 or not isinstance(obj, (dict, list)) or not obj:
+        fp.write(_encoder.encode(obj))
+    elif isinstance(obj, dict):
+        separator = "{"
+        for key, value in obj.items():
+            # encode() of a one-key dict would copy the value; keys are encoded alone
+            fp.write(separator + _encoder.encode(key if isinstance(key, str) else _encoder.encode(key)) + ": ")
+            dump_json(value, fp, depth - 1)
+            separator = ", "
+        fp.write("}")
+    else:
+        separator = "["
+        for value in obj:
+            fp.write(separator)
+            dump_json(value, fp, depth - 1)
+            separator = ", "
+        fp.write("]")
+
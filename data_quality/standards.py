@@ -1,78 +1,63 @@
-import requests
-from bs4 import BeautifulSoup
-import re
-from openai import OpenAI
-import json
+from .fetch import get_webpage_content
+from .llm import PERPLEXITY_URL, structured_completion
+from .prompt_content import DEFAULT_TOKEN_BUDGET, build_prompt_content
+from .standards_index import match_standards
 
 OPEN_AI_KEY = "{API KEY}"
+MATCH_GRADES = ("green", "yellow", "red")
 
-def extract_webpage_text(url, timeout=30):
+
+def validate_standards(output) -> None:
     """
-    Fetches a webpage and extracts its text content, removing scripts, styles, and other non-content elements.
-    
+    Checks the shape of a standards match list.
+
     Args:
-        url (str): The URL of the webpage to fetch
-        timeout (int): Request timeout in seconds
-        
-    Returns:
-        str: Cleaned text content of the webpage
-    
+        output: Parsed LLM answer
+
     Raises:
-        requests.RequestException: If there's an error fetching the webpage
+        ValueError: Describing the first problem found
     """
-    try:
-        # Set a custom User-Agent to avoid potential blocks
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Fetch the webpage
-        response = requests.get(url, headers=headers, timeout=timeout, verify=False)
-        response.raise_for_status()
-        
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'head', 'title', 'meta', '[document]']):
-            element.decompose()
-            
-        # Get text and clean it
-        text = soup.get_text()
-        
-        # Clean the extracted text
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Remove extra whitespace and normalize spaces
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
-        
-    except requests.RequestException as e:
-        raise Exception(f"Error fetching webpage: {str(e)}")
+    if not isinstance(output, list) or not output:
+        raise ValueError("expected a non-empty JSON array of standards")
+    for i, item in enumerate(output):
+        if not isinstance(item, dict):
+            raise ValueError(f"item {i} must be an object")
+        for field in ("standard", "match_grade", "dataset_link"):
+            if not isinstance(item.get(field), str) or not item[field].strip():
+                raise ValueError(f'item {i} needs a non-empty "{field}" string')
+        if item["match_grade"].strip().lower() not in MATCH_GRADES:
+            raise ValueError(f'item {i} has match_grade "{item["match_grade"]}", it must be one of {list(MATCH_GRADES)}')
+
 
-def get_webpage_text(url):
+def evaluate(evaluation_data, url_page, max_tokens=DEFAULT_TOKEN_BUDGET, use_cache=True, llm_fallback=True):
     """
-    Simplified wrapper function for quick text extraction.
-    
+    Picks the three domain standards that best fit a dataset and grades the match.
+
+    The dataset's columns are scored against the local standards index first.
+    Only when no standard reaches yellow, and llm_fallback is set, is the
+    online model asked, with the dataset page as context.
+
     Args:
-        url (str): The URL of the webpage
-    
+        evaluation_data (dict): Technical report of the dataset
+        url_page (str): The dataset page URL, read only for the LLM fallback
+        max_tokens (int): Token budget of the page content sent to the LLM
+        use_cache (bool): False asks the LLM again instead of reusing a cached answer
+        llm_fallback (bool): Ask the LLM when the index finds no matching standard
+
     Returns:
-        str: Extracted text or error message
+        list: standard, match_grade and dataset_link per standard (plus score and
+            matched_fields when they come from the index)
     """
-    try:
-        return extract_webpage_text(url)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    matches = match_standards(evaluation_data['metadata']['columns'])
+    if not llm_fallback or any(match["match_grade"] != "red" for match in matches):
+        return matches
+    return evaluate_with_llm(evaluation_data, url_page, max_tokens, use_cache)
 
-def evaluate(evaluation_data, url_page):
-    
-    content = get_webpage_text(url_page)
 
-    columns_data = str(evaluation_data['metadata']['columns'])
+def evaluate_with_llm(evaluation_data, url_page, max_tokens=DEFAULT_TOKEN_BUDGET, use_cache=True):
+    """Asks the online model for three standards, given the dataset page and its columns."""
+    content = build_prompt_content(get_webpage_content(url_page),
+                                   columns=evaluation_data['metadata']['columns'], max_tokens=max_tokens)
 
     messages = [
         {
@@ -84,7 +69,7 @@ def evaluate(evaluation_data, url_page):
         {
             "role": "user",
             "content": (
-                content+ " " + columns_data + """
+                content + """
     Given this open data dataset, give me 3 data standards that could be used as a baseline to know which fields to publish an open data set with content that better matches the expectation of the data generated. Be specific of the standards given the theme or the area of the data published, not with generic data standards or open data guidelines, like gtfs for transit, or open contracting for data contracts . Grade this dataset with each of those data standards and provide a json for each of the standards, a structure that follows this one, only respond with a JSON like this:
     [
       {
@@ -108,19 +93,17 @@ def evaluate(evaluation_data, url_page):
         },
     ]
 
-    client = OpenAI(api_key=OPEN_AI_KEY, base_url="https://api.perplexity.ai")
-
-    # chat completion without streaming
-    response = client.chat.completions.create(
-        model="llama-3.1-sonar-large-128k-online",
-        messages=messages,
-        temperature=0.5,
-    )
-    output = []
+    # An answer that is still invalid after the correction rounds yields no standards, as before
     try:
-        output = json.loads(json.loads(response.json())['choices'][0]['message']['content'].replace("```",""))
-        if isinstance(output, list):
-            return output
-    except:
-        None
-    return output
\ No newline at end of file
+        return structured_completion(
+            model="llama-3.1-sonar-large-128k-online",
+            messages=messages,
+            temperature=0.5,
+            api_key=OPEN_AI_KEY,
+            base_url=PERPLEXITY_URL,
+            use_cache=use_cache,
+            validate=validate_standards,
+            label="standards",
+        )
+    except ValueError:
+        return []
\ No newline at end of file
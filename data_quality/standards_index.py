@@ -0,0 +1,220 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional
+
+# Field vocabularies of domain standards. `core` lists the fields that
+# identify a dataset as following the standard; `fields` adds the rest.
+STANDARDS: Dict[str, Dict[str, Any]] = {
+    "GTFS": {
+        "url": "https://gtfs.org/schedule/reference/",
+        "core": ["stop_id", "stop_name", "stop_lat", "stop_lon", "route_id", "route_short_name", "route_type",
+                 "trip_id", "service_id", "arrival_time", "departure_time", "stop_sequence"],
+        "fields": ["agency_id", "agency_name", "agency_url", "agency_timezone", "agency_phone", "stop_code",
+                   "stop_desc", "zone_id", "stop_url", "location_type", "parent_station", "wheelchair_boarding",
+                   "route_long_name", "route_desc", "route_url", "route_color", "route_text_color",
+                   "trip_headsign", "trip_short_name", "direction_id", "block_id", "shape_id", "pickup_type",
+                   "drop_off_type", "shape_pt_lat", "shape_pt_lon", "shape_pt_sequence", "monday", "tuesday",
+                   "wednesday", "thursday", "friday", "saturday", "sunday", "start_date", "end_date"],
+    },
+    "Open Contracting Data Standard (OCDS)": {
+        "url": "https://standard.open-contracting.org/latest/es/schema/reference/",
+        "core": ["ocid", "buyer_name", "tender_id", "tender_title", "procurement_method", "award_id",
+                 "supplier_name", "contract_id", "contract_value_amount"],
+        "fields": ["tender_status", "tender_description", "procurement_method_details",
+                   "main_procurement_category", "tender_value_amount", "tender_value_currency",
+                   "number_of_tenderers", "tender_period_start_date", "tender_period_end_date", "award_date",
+                   "award_status", "award_value_amount", "supplier_id", "contract_title", "contract_status",
+                   "contract_date_signed", "contract_period_start_date", "contract_period_end_date",
+                   "contract_value_currency", "buyer_id", "initiation_type", "planning_budget_amount"],
+    },
+    "Popolo": {
+        "url": "https://www.popoloproject.com/specs/",
+        "core": ["name", "family_name", "given_name", "organization_id", "person_id", "post_id", "role",
+                 "start_date", "end_date"],
+        "fields": ["additional_name", "honorific_prefix", "honorific_suffix", "gender", "birth_date",
+                   "death_date", "email", "image", "summary", "biography", "national_identity", "classification",
+                   "parent_id", "founding_date", "dissolution_date", "label", "area_id", "on_behalf_of_id",
+                   "legislative_period_id", "motion_id", "vote_event_id", "voter_id", "option", "result"],
+    },
+    "INEGI Marco Geoestadístico": {
+        "url": "https://www.inegi.org.mx/temas/mg/",
+        "core": ["cve_ent", "nom_ent", "cve_mun", "nom_mun", "cve_loc", "nom_loc", "cvegeo"],
+        "fields": ["ambito", "latitud", "longitud", "altitud", "cve_ageb", "cve_mza", "nom_abr", "pob_total",
+                   "area"],
+    },
+    "INEGI Censo de Población y Vivienda (ITER)": {
+        "url": "https://www.inegi.org.mx/programas/ccpv/2020/",
+        "core": ["entidad", "nom_ent", "mun", "nom_mun", "loc", "nom_loc", "pobtot", "vivtot"],
+        "fields": ["longitud", "latitud", "altitud", "pobfem", "pobmas", "p_0a2", "p_3ymas", "p_12ymas",
+                   "p_15ymas", "p_18ymas", "p_60ymas", "graproes", "pea", "pe_inac", "pocupada", "pdesocup",
+                   "psinder", "pder_ss", "tothog", "hogjef_f", "hogjef_m", "pobhog", "tvivhab", "tvivpar",
+                   "prom_ocup", "pro_ocup_c", "vph_pisodt", "vph_c_elec", "vph_aguadv", "vph_drenaj",
+                   "vph_inter"],
+    },
+    "INEGI DENUE": {
+        "url": "https://www.inegi.org.mx/app/mapa/denue/",
+        "core": ["nom_estab", "raz_social", "codigo_act", "nombre_act", "per_ocu", "cve_ent", "cve_mun"],
+        "fields": ["id", "tipo_vial", "nom_vial", "numero_ext", "numero_int", "tipo_asent", "nomb_asent",
+                   "cod_postal", "entidad", "municipio", "localidad", "telefono", "correoelec", "www",
+                   "tipounieco", "latitud", "longitud", "fecha_alta"],
+    },
+    "SESNSP Incidencia Delictiva": {
+        "url": "https://www.gob.mx/sesnsp/acciones-y-programas/datos-abiertos-de-incidencia-delictiva",
+        "core": ["ano", "clave_ent", "entidad", "cve_municipio", "municipio", "bien_juridico_afectado",
+                 "tipo_de_delito", "subtipo_de_delito", "modalidad"],
+        "fields": ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre",
+                   "octubre", "noviembre", "diciembre", "sexo", "rango_de_edad"],
+    },
+    "Plataforma Digital Nacional - Servidores públicos (S2)": {
+        "url": "https://www.plataformadigitalnacional.org/especificaciones/",
+        "core": ["nombres", "primer_apellido", "segundo_apellido", "institucion_dependencia", "puesto",
+                 "nivel", "rfc", "curp"],
+        "fields": ["id", "fecha_captura", "ejercicio_fiscal", "genero", "tipo_area", "nivel_responsabilidad",
+                   "tipo_procedimiento", "superior_inmediato", "siglas", "clave", "sueldo", "sueldo_bruto",
+                   "sueldo_neto", "cargo", "area", "fecha_ingreso", "correo"],
+    },
+    "Open311 GeoReport v2": {
+        "url": "https://wiki.open311.org/GeoReport_v2/",
+        "core": ["service_request_id", "service_code", "service_name", "status", "requested_datetime",
+                 "address", "lat", "long"],
+        "fields": ["status_notes", "description", "agency_responsible", "service_notice", "updated_datetime",
+                   "expected_datetime", "address_id", "zipcode", "media_url"],
+    },
+    "Open Fiscal Data Package": {
+        "url": "https://fiscal.datapackage.org/",
+        "core": ["amount", "fiscal_year", "administrative_classification", "economic_classification",
+                 "functional_classification", "budget_line"],
+        "fields": ["currency", "date", "payer", "payee", "phase", "direction", "program", "subprogram",
+                   "project", "fund", "approved", "modified", "executed", "paid"],
+    },
+    "Open Referral HSDS": {
+        "url": "https://docs.openreferral.org/",
+        "core": ["organization_id", "service_id", "location_id", "name", "description", "phone", "email",
+                 "address_1", "city", "postal_code"],
+        "fields": ["alternate_name", "url", "tax_id", "year_incorporated", "legal_status", "status",
+                   "interpretation_services", "application_process", "fees", "accreditations", "eligibility",
+                   "region", "state_province", "country", "latitude", "longitude", "transportation"],
+    },
+}
+
+# Spanish and English spellings reduced to the token the vocabularies use
+TOKEN_SYNONYMS = {
+    "clave": "cve", "nombre": "nom", "latitude": "latitud", "longitude": "longitud", "lng": "longitud",
+    "lon": "longitud", "anio": "ano", "year": "ano", "telephone": "telefono", "phone": "telefono",
+    "tel": "telefono", "mail": "correo", "email": "correo",
+}
+
+# Best-match similarity a column needs to count as a standard field
+MATCH_THRESHOLD = 0.5
+GREEN_SCORE = 0.5
+YELLOW_SCORE = 0.2
+
+
+def normalize_field(name: Any) -> str:
+    """Lower-case snake_case without accents, with synonymous tokens unified (e.g. "Clave Municipio" -> "cve_municipio")."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    text = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', text).lower()
+    tokens = [TOKEN_SYNONYMS.get(token, token) for token in re.findall(r'[a-z0-9]+', text)]
+    return "_".join(tokens)
+
+
+def trigrams(name: str) -> frozenset:
+    padded = f"  {name} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class StandardsIndex:
+    """Inverted trigram index over the normalized field names of the standards.
+
+    A column is compared only with the fields it shares trigrams with, and
+    their Jaccard similarity comes straight from the shared trigram count.
+    """
+
+    def __init__(self, standards: Dict[str, Dict[str, Any]] = STANDARDS):
+        self.standards = standards
+        self.fields: List[tuple] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.sizes: List[int] = []
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+        for standard, spec in standards.items():
+            for field in dict.fromkeys(spec["core"] + spec["fields"]):
+                normalized = normalize_field(field)
+                field_id = len(self.fields)
+                self.fields.append((standard, normalized, field in spec["core"]))
+                grams = trigrams(normalized)
+                self.sizes.append(len(grams))
+                for gram in grams:
+                    self.postings[gram].append(field_id)
+                self.exact[normalized].append(field_id)
+
+    def best_matches(self, column: Any) -> Dict[str, tuple]:
+        """Most similar field of each standard for a column: {standard: (field, similarity)}."""
+        normalized = normalize_field(column)
+        best: Dict[str, tuple] = {}
+        for field_id in self.exact.get(normalized, []):
+            best[self.fields[field_id][0]] = (field_id, 1.0)
+        grams = trigrams(normalized)
+        shared = Counter(field_id for gram in grams for field_id in self.postings.get(gram, ()))
+        for field_id, count in shared.items():
+            similarity = count / (len(grams) + self.sizes[field_id] - count)
+            standard = self.fields[field_id][0]
+            if similarity >= MATCH_THRESHOLD and similarity > best.get(standard, (None, 0))[1]:
+                best[standard] = (field_id, similarity)
+        return best
+
+    def match(self, columns: Iterable[Any], top: Optional[int] = 3) -> List[Dict[str, Any]]:
+        """
+        Grades a dataset's columns against every standard.
+
+        The score weighs how much of the dataset the standard explains (matched
+        columns, by similarity) at 60% and how many of the standard's core fields
+        the dataset has at 40%. Scores from 0.5 are green, from 0.2 yellow, the
+        rest red.
+
+        Args:
+            columns (iterable): Column names of the dataset
+            top (int): Number of standards to return, best first (all when None)
+
+        Returns:
+            list: standard, match_grade, dataset_link, score and matched_fields (column to field) per standard
+        """
+        columns = list(columns)
+        coverage: Dict[str, float] = defaultdict(float)
+        matched: Dict[str, Dict[str, str]] = defaultdict(dict)
+        core_found: Dict[str, set] = defaultdict(set)
+        for column in columns:
+            for standard, (field_id, similarity) in self.best_matches(column).items():
+                _, field, is_core = self.fields[field_id]
+                coverage[standard] += similarity
+                matched[standard][str(column)] = field
+                if is_core:
+                    core_found[standard].add(field)
+
+        results = []
+        for standard, spec in self.standards.items():
+            column_share = coverage[standard] / len(columns) if columns else 0.0
+            core_share = len(core_found[standard]) / len(spec["core"])
+            score = round(0.6 * column_share + 0.4 * core_share, 3)
+            grade = "green" if score >= GREEN_SCORE else "yellow" if score >= YELLOW_SCORE else "red"
+            results.append({
+                "standard": standard,
+                "match_grade": grade,
+                "dataset_link": spec["url"],
+                "score": score,
+                "matched_fields": matched[standard]
+            })
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:top] if top else results
+
+
+@lru_cache(maxsize=1)
+def get_index() -> StandardsIndex:
+    """Index of the built-in standards, built once per process."""
+    return StandardsIndex()
+
+
+def match_standards(columns: Iterable[Any], top: Optional[int] = 3) -> List[Dict[str, Any]]:
+    """StandardsIndex.match against the built-in standards."""
+    return get_index().match(columns, top)
@@ -0,0 +1,274 @@
+import pandas as pd
+import numpy as np
+import time
+import tracemalloc
+from typing import Dict, Any, Iterator, List, Optional
+
+from .instrumentation import measure_stage
+from .technical import DataQualityAnalyzer
+from .loader import FALLBACK_ENCODING, sniff_csv, csv_read_options
+from .sketches import ColumnSketch
+from .type_inference import TYPE_NAMES, infer_type_counts
+
+EMAIL_PATTERN = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+
+
+def _merge_dtype(current: Optional[str], new: str) -> str:
+    """Promote the dtype seen so far with the dtype of a new chunk."""
+    if current is None or current == new:
+        return new
+    current_dtype, new_dtype = np.dtype(current), np.dtype(new)
+    if current_dtype.kind in "iuf" and new_dtype.kind in "iuf":
+        return str(np.result_type(current_dtype, new_dtype))
+    return "object"
+
+
+def _merge_str_values(value_counts: pd.Series) -> pd.Series:
+    """Merge the counts of values that have the same string, e.g. 5 and "5"."""
+    value_counts = value_counts.copy()
+    value_counts.index = value_counts.index.map(str)
+    return value_counts.groupby(level=0, sort=False).sum().sort_values(ascending=False, kind="stable")
+
+
+class ColumnAccumulator:
+    """Mergeable running statistics for a single column.
+
+    Every chunk is reduced to counts, Welford moments, extremes and length
+    stats, so memory depends on the chunk size and on the number of distinct
+    values, never on the number of rows. With top_k the exact value counts are
+    replaced by a ColumnSketch so memory stays flat on high-cardinality
+    columns too. Columns whose inferred type changes between chunks are
+    reported as object columns, with numbers and strings of the same text
+    counted as one value. The sketches can only do that from the chunk that
+    made the column mixed on: numbers hashed before it and the same strings
+    after it are estimated as distinct values.
+    """
+
+    def __init__(self, name: str, top_k: Optional[int] = None):
+        self.name = name
+        self.dtype: Optional[str] = None
+        self.all_strings = True
+        self.row_count = 0
+        self.null_count = 0
+        # Welford / Chan moments over the non-null numeric values
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        # String length stats over the non-null string values
+        self.length_count = 0
+        self.length_sum = 0
+        self.length_min = None
+        self.length_max = None
+        self.pattern_matches = 0
+        self.type_counts = dict.fromkeys(TYPE_NAMES, 0)
+        self.value_counts = pd.Series(dtype="int64")
+        self.sketch = ColumnSketch(top_k) if top_k is not None else None
+
+    def update(self, series: pd.Series) -> None:
+        """Fold a chunk of the column into the running statistics."""
+        null_mask = series.isna()
+        chunk_nulls = int(null_mask.sum())
+        self.row_count += len(series)
+        self.null_count += chunk_nulls
+        if chunk_nulls == len(series):
+            # An all-null chunk carries no dtype information
+            self.type_counts["empty"] += chunk_nulls
+            return
+
+        self.dtype = _merge_dtype(self.dtype, str(series.dtype))
+        self.all_strings = self.all_strings and pd.api.types.is_string_dtype(series)
+
+        value_counts = series.value_counts()
+        for name, count in infer_type_counts(series, value_counts, chunk_nulls).items():
+            self.type_counts[name] += count
+        if self.sketch is not None:
+            if self.dtype == "object" and pd.api.types.is_numeric_dtype(series):
+                # Once the column is mixed, numbers are sketched by their string so 5 and "5" hash alike
+                strings = series.dropna().astype(str)
+                self.sketch.update(strings, strings.value_counts())
+            else:
+                self.sketch.update(series, value_counts)
+        else:
+            self.value_counts = self.value_counts.add(value_counts, fill_value=0)
+
+        if pd.api.types.is_numeric_dtype(series):
+            values = series[~null_mask].to_numpy(dtype="float64")
+            self._merge_moments(len(values), values.mean(), ((values - values.mean()) ** 2).sum())
+            self._merge_extremes(values.min(), values.max())
+        elif pd.api.types.is_string_dtype(series):
+            lengths = series.str.len().dropna()
+            self._merge_lengths(len(lengths), int(lengths.sum()), lengths.min(), lengths.max())
+            if "email" in self.name.lower():
+                self.pattern_matches += int(series.str.match(EMAIL_PATTERN, na=False).sum())
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        """Fold the statistics of another accumulator for the same column into this one."""
+        self.row_count += other.row_count
+        self.null_count += other.null_count
+        for name, count in other.type_counts.items():
+            self.type_counts[name] += count
+        if other.dtype is None:
+            return self
+        self.dtype = _merge_dtype(self.dtype, other.dtype)
+        self.all_strings = self.all_strings and other.all_strings
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        else:
+            self.value_counts = self.value_counts.add(other.value_counts, fill_value=0)
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+            self._merge_extremes(other.min, other.max)
+        if other.length_count:
+            self._merge_lengths(other.length_count, other.length_sum, other.length_min, other.length_max)
+        self.pattern_matches += other.pattern_matches
+        return self
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def _merge_extremes(self, minimum, maximum) -> None:
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+
+    def _merge_lengths(self, count: int, total: int, minimum, maximum) -> None:
+        self.length_count += count
+        self.length_sum += total
+        self.length_min = minimum if self.length_min is None else min(self.length_min, minimum)
+        self.length_max = maximum if self.length_max is None else max(self.length_max, maximum)
+
+    def to_profile(self) -> Dict[str, Any]:
+        """Build a column profile with the keys DataQualityAnalyzer checks read."""
+        dtype = self.dtype or "float64"
+        is_numeric = np.dtype(dtype).kind in "biuf"
+        is_string = dtype == "object" and self.all_strings
+        # Numeric chunks of a column that ended up mixed were parsed as numbers
+        mixed = dtype == "object" and self.count
+        if self.sketch is not None:
+            profile = self.sketch.summary()
+            if mixed:
+                profile["value_counts"] = _merge_str_values(profile["value_counts"])
+        else:
+            value_counts = _merge_str_values(self.value_counts) if mixed else self.value_counts
+            value_counts = value_counts.astype("int64").sort_values(ascending=False, kind="stable")
+            profile = {
+                "value_counts": value_counts,
+                "unique_count": len(value_counts),
+                "duplicate_count": int((value_counts > 1).sum()),
+            }
+
+        profile.update({
+            "dtype": dtype,
+            "is_numeric": is_numeric,
+            "is_string": is_string,
+            "null_count": self.null_count,
+            "type_counts": dict(self.type_counts),
+        })
+        if is_numeric:
+            profile.update({
+                "min": self.min if self.count else np.nan,
+                "max": self.max if self.count else np.nan,
+                "mean": self.mean if self.count else np.nan,
+                "std": np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+            })
+        elif is_string:
+            profile["length_stats"] = {
+                "min_length": self.length_min,
+                "max_length": self.length_max,
+                "mean_length": self.length_sum / self.length_count if self.length_count else np.nan
+            }
+            if "email" in self.name.lower():
+                profile["pattern_matches"] = self.pattern_matches
+        return profile
+
+
+class StreamingDataQualityAnalyzer(DataQualityAnalyzer):
+    """DataQualityAnalyzer that reads a CSV in fixed-size chunks.
+
+    The file is never held in memory as a whole; each chunk is folded into a
+    ColumnAccumulator per column and the checks read the profiles the
+    accumulators build, so the report has the same schema as the in-memory
+    analyzer.
+    """
+
+    def __init__(self, file_path: str, chunksize: int = 100_000, top_k: Optional[int] = None):
+        """Initialize the analyzer and stream the file through the accumulators."""
+        if not file_path.endswith('.csv'):
+            raise ValueError("Streaming mode supports CSV files only.")
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.top_k = top_k
+        self.workers = 1
+        self.parallel_info = None
+        self.df = None
+        self.timings: List[Dict[str, Any]] = []
+        self.load_info = sniff_csv(file_path)
+
+        self._parse_seconds = 0.0
+        self._peak_memory = None
+        with measure_stage("load", detail=file_path, sink=self.timings) as timing:
+            try:
+                self._consume(self._read_chunks())
+            except UnicodeDecodeError:
+                # A legacy byte past the sample (mixed-encoding exports), or an ASCII-only
+                # sample that could not tell utf-8 from a legacy encoding
+                self.load_info["encoding"] = FALLBACK_ENCODING
+                self._parse_seconds = 0.0
+                self._consume(self._read_chunks(encoding_errors="replace"))
+            timing["rows"] = self.total_rows
+        self.load_info.update({
+            "engine": "c",
+            "chunksize": chunksize,
+            "parse_seconds": round(self._parse_seconds, 4),
+            "peak_memory_bytes": self._peak_memory
+        })
+
+        self.total_columns = len(self.columns)
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+
+    def _read_chunks(self, source=None, **overrides) -> Iterator[pd.DataFrame]:
+        """Yield chunks of the file (or of an open handle into it) with the sniffed settings."""
+        options = {**csv_read_options(self.load_info), **overrides}
+        with pd.read_csv(source or self.file_path, chunksize=self.chunksize, **options) as reader:
+            while True:
+                # Only the parse of each chunk is traced; the peak is the largest one
+                tracing = not tracemalloc.is_tracing()
+                if tracing:
+                    tracemalloc.start()
+                try:
+                    start = time.perf_counter()
+                    chunk = next(reader, None)
+                    self._parse_seconds += time.perf_counter() - start
+                    if tracing:
+                        self._peak_memory = max(self._peak_memory or 0, tracemalloc.get_traced_memory()[1])
+                finally:
+                    if tracing:
+                        tracemalloc.stop()
+                if chunk is None:
+                    break
+                yield chunk
+
+    def _consume(self, chunks: Iterator[pd.DataFrame]) -> None:
+        self.accumulators: Dict[str, ColumnAccumulator] = {}
+        self.columns = []
+        self.total_rows = 0
+        for chunk in chunks:
+            if not self.accumulators:
+                self.columns = list(chunk.columns)
+                self.accumulators = {col: ColumnAccumulator(col, self.top_k) for col in self.columns}
+            self.update(chunk)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk of rows into the per-column accumulators."""
+        for col in self.columns:
+            self.accumulators[col].update(chunk[col])
+        self.total_rows += len(chunk)
+        self._profiles = {}
+
+    def _profile_column(self, col: str) -> Dict[str, Any]:
+        return self.accumulators[col].to_profile()
@@ -1,44 +1,220 @@
 import pandas as pd
 import numpy as np
 import json
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import re
-from typing import Dict, List, Any
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterable, Optional
+
+from .instrumentation import measure_stage
+from .loader import load_table, compact_dtypes
+from .serialize import to_native
+from .type_inference import infer_type_counts, mixed_type_ratio
+
+# Keys cached reports and incremental state: bump it whenever report contents change
+ANALYSIS_VERSION = "1.2"
+
+# Accuracy penalty for an object column whose non-empty cells are split evenly
+# between two inferred types; smaller minorities are penalized proportionally
+MIXED_TYPE_PENALTY = 0.05
+
+# Checks a report can run, in report order
+CHECKS = ("completeness", "accuracy", "consistency", "uniqueness")
+REPORT_SECTIONS = ("metadata", "quality_checks", "overall_quality", "thresholds")
+
+# Analyzer shared with forked profiling workers, which inherit its DataFrame
+# copy-on-write instead of receiving it pickled
+_shared_analyzer = None
+
+
+def _profile_shared_column(col: str):
+    """Profile one column of the analyzer inherited from the parent process."""
+    start = time.process_time()
+    profile = _shared_analyzer._profile_column(col)
+    return col, profile, time.process_time() - start
+
 
 class DataQualityAnalyzer:
-    def __init__(self, file_path: str):
-        """Initialize the analyzer with a file path."""
+    def __init__(self, file_path: str, top_k: Optional[int] = None, engine: Optional[str] = None,
+                 compact: bool = True, workers: int = 1, columns: Optional[Iterable[str]] = None):
+        """Initialize the analyzer with a file path.
+
+        top_k bounds the value_distribution and duplicate_values maps of the
+        report to the k most frequent values and adds their error bounds.
+        engine selects the pd.read_csv engine, e.g. "pyarrow".
+        compact converts low-cardinality text columns to categoricals and
+        downcasts integers after loading; the report keeps the parsed dtypes.
+        workers > 1 profiles the columns in a pool of forked worker processes.
+        columns restricts loading and analysis to those columns.
+        """
         self.file_path = file_path
-        # Read file based on extension
-        if file_path.endswith('.csv'):
-            try:
-                self.df = pd.read_csv(file_path)
-            except:
-                self.df = pd.read_csv(file_path, encoding="latin-1")
-            
-        elif file_path.endswith(('.xlsx', '.xls')):
-            try:
-                self.df = pd.read_excel(file_path)
-            except:
-                self.df = pd.read_excel(file_path, encoding="latin-1")
-        else:
-            raise ValueError("Unsupported file format. Please use CSV or Excel files.")
-        
+        self.top_k = top_k
+        self.workers = workers
+        self.parallel_info: Optional[Dict[str, Any]] = None
+        # Wall time, CPU time and memory of each stage, reported in the metadata
+        self.timings: List[Dict[str, Any]] = []
+        with measure_stage("load", detail=file_path, sink=self.timings) as timing:
+            # Sniff the file and read it in a single parse
+            self.df, self.load_info = load_table(file_path, engine=engine, columns=columns)
+            self.source_dtypes = {col: str(dtype) for col, dtype in self.df.dtypes.items()}
+            if compact:
+                self.df, self.load_info["compact_dtypes"] = compact_dtypes(self.df)
+            timing["rows"] = len(self.df)
+
         self.total_rows = len(self.df)
         self.total_columns = len(self.df.columns)
         self.columns = list(self.df.columns)
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._null_counts: Dict[str, int] = {}
+
+    def _profile_column(self, col: str) -> Dict[str, Any]:
+        """Scan a column once and collect the statistics every check reads."""
+        series = self.df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return self._profile_categorical(col)
+        value_counts = series.value_counts()
+        profile = {
+            "dtype": self.source_dtypes.get(col, str(series.dtype)),
+            "is_numeric": pd.api.types.is_numeric_dtype(series),
+            "is_string": pd.api.types.is_string_dtype(series),
+            "null_count": int(series.isna().sum()),
+            "value_counts": value_counts,
+            "unique_count": len(value_counts),
+            "duplicate_count": int((value_counts > 1).sum()),
+        }
+
+        if profile["is_numeric"]:
+            profile.update({
+                "min": series.min(),
+                "max": series.max(),
+                "mean": series.mean(),
+                "std": series.std()
+            })
+        elif profile["is_string"]:
+            lengths = series.str.len()
+            profile["length_stats"] = {
+                "min_length": lengths.min(),
+                "max_length": lengths.max(),
+                "mean_length": lengths.mean()
+            }
+            if "email" in col.lower():
+                email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+                profile["pattern_matches"] = int(series.str.match(email_pattern, na=False).sum())
+
+        profile["type_counts"] = infer_type_counts(series, value_counts, profile["null_count"])
+
+        return profile
+
+    def _profile_categorical(self, col: str) -> Dict[str, Any]:
+        """Profile a categorical column from its codes and categories only."""
+        series = self.df[col]
+        categories = series.cat.categories
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        present = counts > 0
+        value_counts = pd.Series(counts[present], index=categories[present], name="count")
+        value_counts.index.name = col
+        value_counts = value_counts.sort_values(ascending=False)
+        null_count = int((codes == -1).sum())
+        profile = {
+            "dtype": self.source_dtypes.get(col, str(series.dtype)),
+            "is_numeric": False,
+            # Matches is_string_dtype on the object column, which is False once it holds nulls
+            "is_string": pd.api.types.is_string_dtype(categories) and not null_count,
+            "null_count": null_count,
+            "value_counts": value_counts,
+            "unique_count": len(value_counts),
+            "duplicate_count": int((value_counts > 1).sum()),
+        }
+
+        if profile["is_string"]:
+            # Per-category lengths weighted by how often each category occurs
+            lengths = value_counts.index.str.len().to_numpy()
+            profile["length_stats"] = {
+                "min_length": lengths.min() if len(lengths) else np.nan,
+                "max_length": lengths.max() if len(lengths) else np.nan,
+                "mean_length": (lengths * value_counts.to_numpy()).sum() / value_counts.sum()
+                if len(lengths) else np.nan
+            }
+            if "email" in col.lower():
+                email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+                matches = np.asarray(value_counts.index.str.match(email_pattern), dtype=bool)
+                profile["pattern_matches"] = int(value_counts.to_numpy()[matches].sum())
+
+        profile["type_counts"] = infer_type_counts(series, value_counts, profile["null_count"])
+
+        return profile
+
+    def get_column_profile(self, col: str) -> Dict[str, Any]:
+        """Return the cached profile of a column, building it on first use."""
+        if col not in self._profiles:
+            self._profiles[col] = self._profile_column(col)
+        return self._profiles[col]
+
+    def null_counts(self) -> Dict[str, int]:
+        """Null count of every column, from one isna pass over the columns not profiled yet."""
+        if self.df is None:
+            # Streaming analyzers count nulls while reading
+            return {col: self.get_column_profile(col)["null_count"] for col in self.columns}
+        pending = [col for col in self.columns if col not in self._profiles and col not in self._null_counts]
+        if pending:
+            self._null_counts.update((col, int(count)) for col, count in self.df[pending].isna().sum().items())
+        return {col: self._profiles[col]["null_count"] if col in self._profiles else self._null_counts[col]
+                for col in self.columns}
+
+    def profile_columns(self) -> Dict[str, Dict[str, Any]]:
+        """Profile every column in a single pass, in parallel when workers > 1."""
+        pending = [col for col in self.columns if col not in self._profiles]
+        if pending:
+            with measure_stage("profile", rows=self.total_rows, detail=f"{len(pending)} columns", sink=self.timings):
+                if self.workers > 1 and len(pending) > 1:
+                    self._profile_in_pool(pending)
+                for col in pending:
+                    self.get_column_profile(col)
+        return {col: self.get_column_profile(col) for col in self.columns}
+
+    def _profile_in_pool(self, columns: List[str]) -> None:
+        """Fan column profiling out over forked processes and record the speedup."""
+        global _shared_analyzer
+        if "fork" not in multiprocessing.get_all_start_methods():
+            warnings.warn("Parallel profiling needs the fork start method; profiling serially.")
+            return
+
+        start = time.perf_counter()
+        # CPU time the workers spent profiling, i.e. what a serial run would take
+        column_seconds = 0.0
+        workers = min(self.workers, len(columns))
+        _shared_analyzer = self
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                for col, profile, seconds in pool.map(_profile_shared_column, columns):
+                    self._profiles[col] = profile
+                    column_seconds += seconds
+        finally:
+            _shared_analyzer = None
+        wall_seconds = time.perf_counter() - start
+
+        self.parallel_info = {
+            "workers": workers,
+            "profile_seconds": round(wall_seconds, 4),
+            "serial_profile_seconds": round(column_seconds, 4),
+            "speedup": round(column_seconds / wall_seconds, 2) if wall_seconds else None
+        }
 
     def analyze_completeness(self) -> Dict[str, Any]:
         """Analyze data completeness."""
         total_cells = self.total_rows * self.total_columns
-        total_null_cells = self.df.isna().sum().sum()
-        null_counts = self.df.isna().sum().to_dict()
+        null_counts = self.null_counts()
+        total_null_cells = sum(null_counts.values())
         
         completeness_ratio = 1 - (total_null_cells / total_cells)
         
         validations = {}
         for col in self.columns:
-            unexpected_count = self.df[col].isna().sum()
+            unexpected_count = null_counts[col]
             unexpected_percent = (unexpected_count / self.total_rows) * 100
             validations[col] = {
                 "success": unexpected_count == 0,
@@ -62,33 +238,36 @@ class DataQualityAnalyzer:
         """Analyze data accuracy."""
         metrics = {}
         for col in self.columns:
+            profile = self.get_column_profile(col)
             col_metrics = {}
-            col_metrics["data_type"] = str(self.df[col].dtype)
-            col_metrics["unique_values_count"] = self.df[col].nunique()
+            col_metrics["data_type"] = profile["dtype"]
+            col_metrics["unique_values_count"] = profile["unique_count"]
+            col_metrics["type_counts"] = profile["type_counts"]
+            col_metrics["type_ratios"] = {
+                name: round(count / self.total_rows, 3) for name, count in profile["type_counts"].items()
+            }
             
-            if pd.api.types.is_numeric_dtype(self.df[col]):
+            if profile["is_numeric"]:
                 col_metrics.update({
-                    "min": float(self.df[col].min()),
-                    "max": float(self.df[col].max()),
-                    "mean": round(float(self.df[col].mean()), 3),
-                    "std": round(float(self.df[col].std()), 3)
+                    "min": float(profile["min"]),
+                    "max": float(profile["max"]),
+                    "mean": round(float(profile["mean"]), 3),
+                    "std": round(float(profile["std"]), 3)
                 })
-            elif pd.api.types.is_string_dtype(self.df[col]):
-                if "email" in col.lower():
-                    email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-                    pattern_matches = self.df[col].str.match(email_pattern, na=False)
-                    col_metrics["pattern_match_rate"] = round(pattern_matches.mean(), 3)
+            elif profile["is_string"]:
+                if "pattern_matches" in profile:
+                    col_metrics["pattern_match_rate"] = round(profile["pattern_matches"] / self.total_rows, 3)
             
             metrics[col] = col_metrics
         
         # Simplified accuracy score based on data type consistency
         accuracy_score = 1.0
         for col in self.columns:
-            if self.df[col].dtype == 'object':
+            profile = self.get_column_profile(col)
+            if profile["dtype"] == 'object':
                 # Penalize for mixed data types in string columns
-                unique_types = self.df[col].apply(type).nunique()
-                if unique_types > 1:
-                    accuracy_score -= 0.05
+                mixed_ratio = mixed_type_ratio(profile["type_counts"])
+                accuracy_score -= MIXED_TYPE_PENALTY * min(1.0, 2 * mixed_ratio)
         
         return {
             "metrics": metrics,
@@ -105,19 +284,25 @@ class DataQualityAnalyzer:
         """Analyze data consistency."""
         metrics = {}
         for col in self.columns:
-            if pd.api.types.is_string_dtype(self.df[col]):
-                value_counts = self.df[col].value_counts()
+            profile = self.get_column_profile(col)
+            if profile["is_string"]:
+                value_counts = profile["value_counts"]
+                length_stats = profile["length_stats"]
+                value_distribution = value_counts if self.top_k is None else value_counts.head(self.top_k)
                 metrics[col] = {
-                    "unique_values_count": len(value_counts),
+                    "unique_values_count": profile["unique_count"],
                     "most_common_value": value_counts.index[0],
                     "most_common_value_frequency": int(value_counts.iloc[0]),
-                    "value_distribution": value_counts.to_dict(),
+                    "value_distribution": value_distribution.to_dict(),
                     "length_stats": {
-                        "min_length": int(self.df[col].str.len().min()),
-                        "max_length": int(self.df[col].str.len().max()),
-                        "mean_length": round(float(self.df[col].str.len().mean()), 1)
+                        "min_length": int(length_stats["min_length"]),
+                        "max_length": int(length_stats["max_length"]),
+                        "mean_length": round(float(length_stats["mean_length"]), 1)
                     }
                 }
+                if self.top_k is not None:
+                    metrics[col]["unique_values_count_error"] = profile.get("unique_count_error", 0.0)
+                    metrics[col]["value_distribution_error"] = profile.get("value_counts_error", 0)
         
         # Calculate consistency score based on value distributions
         consistency_score = 1.0
@@ -141,14 +326,20 @@ class DataQualityAnalyzer:
         """Analyze data uniqueness."""
         metrics = {}
         for col in self.columns:
-            duplicate_counts = self.df[col].value_counts()
-            duplicates = duplicate_counts[duplicate_counts > 1].to_dict()
+            profile = self.get_column_profile(col)
+            duplicate_counts = profile["value_counts"]
+            duplicates = duplicate_counts[duplicate_counts > 1]
+            if self.top_k is not None:
+                duplicates = duplicates.head(self.top_k)
             metrics[col] = {
-                "unique_count": self.df[col].nunique(),
-                "duplicate_count": len(duplicates),
-                "duplication_ratio": round(len(duplicates) / self.total_rows, 3),
-                "duplicate_values": duplicates
+                "unique_count": profile["unique_count"],
+                "duplicate_count": profile["duplicate_count"],
+                "duplication_ratio": round(profile["duplicate_count"] / self.total_rows, 3),
+                "duplicate_values": duplicates.to_dict()
             }
+            if self.top_k is not None:
+                metrics[col]["duplicate_count_error"] = profile.get("duplicate_count_error", 0)
+                metrics[col]["duplicate_values_error"] = profile.get("value_counts_error", 0)
         
         return {
             "metrics": metrics,
@@ -182,82 +373,206 @@ class DataQualityAnalyzer:
             "threshold_met": score >= 0.85
         }
 
-    def generate_report(self) -> Dict[str, Any]:
-        """Generate complete data quality report."""
-        completeness = self.analyze_completeness()
-        accuracy = self.analyze_accuracy()
-        consistency = self.analyze_consistency()
-        uniqueness = self.analyze_uniqueness()
-        
-        category_scores = {
-            "completeness": completeness["grade"]["score"],
-            "accuracy": accuracy["grade"]["score"],
-            "consistency": consistency["grade"]["score"],
-            "uniqueness": uniqueness["grade"]["score"]
+    def report_metadata(self) -> Dict[str, Any]:
+        """The metadata section of the report."""
+        return {
+            "filename": self.file_path,
+            "timestamp": datetime.now().isoformat(),
+            "total_rows": self.total_rows,
+            "total_columns": self.total_columns,
+            "columns": self.columns,
+            "analysis_version": ANALYSIS_VERSION,
+            "load": self.load_info,
+            "parallel": self.parallel_info,
+            "timings": self.timings
         }
-        
-        overall_score = round(np.mean(list(category_scores.values())), 3)
-        
+
+    def lazy_report(self, checks: Optional[Iterable[str]] = None) -> "LazyReport":
+        """Report whose sections are computed on first access; see LazyReport."""
+        return LazyReport(self, checks)
+
+    def generate_report(self, checks: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Generate complete data quality report, with native Python values only.
+
+        checks limits the report to some of CHECKS; a completeness-only report
+        skips column profiling and just counts nulls.
+        """
+        return self.lazy_report(checks).to_dict()
+
+
+class LazyReport(Mapping):
+    """Data quality report that computes each section the first time it is read.
+
+    Sections, and each check under quality_checks, are kept once computed, so
+    a quick gate such as report["quality_checks"]["completeness"] costs one
+    null-count pass and reading the rest later does not repeat it. The
+    overall_quality section runs every selected check. to_dict() builds the
+    plain report generate_report returns.
+    """
+
+    def __init__(self, analyzer: DataQualityAnalyzer, checks: Optional[Iterable[str]] = None):
+        self.analyzer = analyzer
+        self.checks = tuple(CHECKS if checks is None else checks)
+        unknown = [check for check in self.checks if check not in CHECKS]
+        if unknown or not self.checks:
+            raise ValueError(f"Unknown or no checks {unknown}; choose from {list(CHECKS)}.")
+        self._sections: Dict[str, Any] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def __getitem__(self, section: str) -> Any:
+        if section not in self._sections:
+            if section not in REPORT_SECTIONS:
+                raise KeyError(section)
+            self._sections[section] = getattr(self, f"_{section}")()
+        return self._sections[section]
+
+    def __iter__(self):
+        return iter(REPORT_SECTIONS)
+
+    def __len__(self) -> int:
+        return len(REPORT_SECTIONS)
+
+    def check(self, name: str) -> Dict[str, Any]:
+        """Result of one selected check, running it on first use."""
+        if name not in self.checks:
+            raise KeyError(name)
+        if name not in self._results:
+            if name != "completeness":
+                # Profile every column at once, in the worker pool when there is one
+                self.analyzer.profile_columns()
+            with measure_stage(f"check.{name}", rows=self.analyzer.total_rows, sink=self.analyzer.timings):
+                self._results[name] = to_native(getattr(self.analyzer, f"analyze_{name}")())
+        return self._results[name]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The whole report as a plain dict."""
+        # The checks run first so the metadata records how columns were profiled
+        for check in self.checks:
+            self.check(check)
+        report = {section: self[section] for section in REPORT_SECTIONS}
+        report["quality_checks"] = dict(report["quality_checks"])
+        return report
+
+    def _metadata(self) -> Dict[str, Any]:
+        return to_native(self.analyzer.report_metadata())
+
+    def _quality_checks(self) -> Mapping:
+        return _LazyChecks(self)
+
+    def _overall_quality(self) -> Dict[str, Any]:
+        category_scores = {check: self.check(check)["grade"]["score"] for check in self.checks}
+        overall_score = round(float(np.mean(list(category_scores.values()))), 3)
+
         recommendations = []
-        if completeness["grade"]["score"] < 0.98:
+        if "completeness" in category_scores and category_scores["completeness"] < 0.98:
             recommendations.append({
                 "category": "completeness",
                 "issue": "Missing values detected",
                 "impact": "Medium",
                 "suggestion": "Review and fill in missing data where possible"
             })
-        
-        if uniqueness["grade"]["score"] < 0.98:
+
+        if "uniqueness" in category_scores and category_scores["uniqueness"] < 0.98:
             recommendations.append({
                 "category": "uniqueness",
                 "issue": "Duplicate values found",
                 "impact": "High",
                 "suggestion": "Investigate and resolve duplicate records"
             })
-        
+
+        grade = self.analyzer._calculate_grade(overall_score)
         return {
-            "metadata": {
-                "filename": self.file_path,
-                "timestamp": datetime.now().isoformat(),
-                "total_rows": self.total_rows,
-                "total_columns": self.total_columns,
-                "columns": self.columns,
-                "analysis_version": "1.0"
-            },
-            "quality_checks": {
-                "completeness": completeness,
-                "accuracy": accuracy,
-                "consistency": consistency,
-                "uniqueness": uniqueness
-            },
-            "overall_quality": {
-                "score": overall_score,
-                "grade": self._calculate_grade(overall_score)["interpretation"],
-                "interpretation": self._calculate_grade(overall_score)["interpretation"],
-                "category_scores": category_scores,
-                "recommendations": recommendations
+            "score": overall_score,
+            "grade": grade["interpretation"],
+            "interpretation": grade["interpretation"],
+            "category_scores": category_scores,
+            "recommendations": recommendations
+        }
+
+    def _thresholds(self) -> Dict[str, Any]:
+        return {
+            "grades": {
+                "A": {"min": 0.95, "interpretation": "Excellent"},
+                "B": {"min": 0.90, "interpretation": "Good"},
+                "C": {"min": 0.85, "interpretation": "Fair"},
+                "D": {"min": 0.80, "interpretation": "Poor"},
+                "F": {"min": 0.00, "interpretation": "Failed"}
             },
-            "thresholds": {
-                "grades": {
-                    "A": {"min": 0.95, "interpretation": "Excellent"},
-                    "B": {"min": 0.90, "interpretation": "Good"},
-                    "C": {"min": 0.85, "interpretation": "Fair"},
-                    "D": {"min": 0.80, "interpretation": "Poor"},
-                    "F": {"min": 0.00, "interpretation": "Failed"}
-                },
-                "critical_checks": {
-                    "null_tolerance": ["id", "email"],
-                    "uniqueness_required": ["id", "email"],
-                    "format_validation": ["email", "signup_date"]
-                }
+            "critical_checks": {
+                "null_tolerance": ["id", "email"],
+                "uniqueness_required": ["id", "email"],
+                "format_validation": ["email", "signup_date"]
             }
         }
 
-def evaluate(data_path):
+
+class _LazyChecks(Mapping):
+    """The quality_checks section of a LazyReport: each check runs when it is read."""
+
+    def __init__(self, report: LazyReport):
+        self.report = report
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self.report.check(name)
+
+    def __iter__(self):
+        return iter(self.report.checks)
+
+    def __len__(self) -> int:
+        return len(self.report.checks)
+
+
+def evaluate(data_path, streaming=False, chunksize=100_000, top_k=None, engine=None, compact=True, workers=1,
+             cache=None, incremental=False, state_path=None, checks=None, columns=None):
+    # Serve unchanged files from the report cache (a ReportCache or its directory)
+    if cache is not None:
+        from .cache import ReportCache
+        if not isinstance(cache, ReportCache):
+            cache = ReportCache(cache)
+        options = {"streaming": streaming or incremental, "top_k": top_k, "compact": compact}
+        if streaming or incremental:
+            options["chunksize"] = chunksize
+        else:
+            # The parser can read the same file differently
+            options["engine"] = engine
+        # Only set when used, so full reports keep their existing cache keys
+        if checks is not None:
+            options["checks"] = list(checks)
+        if columns is not None:
+            options["columns"] = list(columns)
+        timings = []
+        with measure_stage("cache_lookup", detail=data_path, sink=timings):
+            key = cache.key(data_path, options)
+            report = cache.get(key)
+        if report is not None:
+            report["metadata"]["cache"] = {"key": key, "hit": True}
+            # The stored timings are those of the run that filled the cache
+            report["metadata"]["timings"] = timings
+            return report
+
+    if columns is not None and (streaming or incremental):
+        raise ValueError("Selecting columns needs the in-memory analyzer (streaming=False, incremental=False).")
+
     # Initialize analyzer with your data file
-    analyzer = DataQualityAnalyzer(data_path)
+    if incremental:
+        # Saved accumulator state lets an append-only file re-read only its new rows
+        from .incremental import IncrementalDataQualityAnalyzer
+        analyzer = IncrementalDataQualityAnalyzer(data_path, state_path=state_path, chunksize=chunksize, top_k=top_k)
+    elif streaming:
+        # Imported here because the streaming analyzer subclasses DataQualityAnalyzer
+        from .streaming import StreamingDataQualityAnalyzer
+        analyzer = StreamingDataQualityAnalyzer(data_path, chunksize=chunksize, top_k=top_k)
+    else:
+        analyzer = DataQualityAnalyzer(data_path, top_k=top_k, engine=engine, compact=compact, workers=workers,
+                                       columns=columns)
 
     # Generate report
-    report = analyzer.generate_report()
-    
+    report = analyzer.generate_report(checks)
+    if cache is not None:
+        cache.put(key, report)
+        # Hits come back from JSON, with string keys in value_distribution and
+        # duplicate_values; a miss returns the report in the same form
+        report = json.loads(json.dumps(report))
+        report["metadata"]["cache"] = {"key": key, "hit": False}
+
     return report
\ No newline at end of file
@@ -0,0 +1,83 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+TYPE_NAMES = ("int", "float", "date", "bool", "empty", "text")
+
+BOOL_PATTERN = r'(?i)true|false|verdadero|falso|yes|no|si|sí'
+BOOL_MAX_LENGTH = len("verdadero")
+INT_PATTERN = r'[+-]?(\d+|\d{1,3}(,\d{3})+)'
+FLOAT_PATTERN = r'[+-]?(\d+\.\d*|\.\d+|\d{1,3}(,\d{3})+\.\d*|\d+(\.\d*)?[eE][+-]?\d+)'
+DATE_PATTERN = (
+    r'\d{4}-\d{1,2}-\d{1,2}([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?'
+    r'|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}( \d{1,2}:\d{2}(:\d{2})?)?'
+)
+
+
+def classify_strings(values: pd.Series) -> np.ndarray:
+    """Label each string as int, float, date, bool, empty or text in bulk.
+
+    Every pattern runs only on the values that can still match it, so a
+    column of free text costs a strip, a length and one prefix match.
+    """
+    stripped = values.str.strip()
+    lengths = stripped.str.len().to_numpy()
+    labels = np.full(len(values), "text", dtype=object)
+    labels[lengths == 0] = "empty"
+
+    short = (lengths > 0) & (lengths <= BOOL_MAX_LENGTH)
+    if short.any():
+        labels[short] = np.where(stripped[short].str.fullmatch(BOOL_PATTERN).to_numpy(dtype=bool), "bool", "text")
+
+    # int, float and date values all start with a digit, a sign or a dot
+    candidates = stripped.str.match(r'[+\-.\d]').to_numpy(dtype=bool) & (labels == "text")
+    for label, pattern in (("int", INT_PATTERN), ("float", FLOAT_PATTERN), ("date", DATE_PATTERN)):
+        if not candidates.any():
+            break
+        matches = stripped[candidates].str.fullmatch(pattern).to_numpy(dtype=bool)
+        positions = np.flatnonzero(candidates)[matches]
+        labels[positions] = label
+        candidates[positions] = False
+    return labels
+
+
+def infer_type_counts(series: pd.Series, value_counts: Optional[pd.Series] = None,
+                      null_count: Optional[int] = None) -> Dict[str, int]:
+    """Count how many cells of a column hold each inferred type.
+
+    Typed columns are classified from their dtype. Object columns are
+    classified on their distinct values only and weighted by value_counts,
+    so the regexes run once per distinct value instead of once per cell.
+    """
+    counts = dict.fromkeys(TYPE_NAMES, 0)
+    if null_count is None:
+        null_count = int(series.isna().sum())
+    counts["empty"] = null_count
+    non_null = len(series) - null_count
+
+    kind = series.dtype.kind
+    if kind in "iu":
+        counts["int"] = non_null
+    elif kind == "f":
+        counts["float"] = non_null
+    elif kind == "b":
+        counts["bool"] = non_null
+    elif kind == "M":
+        counts["date"] = non_null
+    else:
+        if value_counts is None:
+            value_counts = series.value_counts()
+        if len(value_counts):
+            labels = classify_strings(pd.Series(value_counts.index.astype(str)))
+            for label, count in value_counts.groupby(labels).sum().items():
+                counts[label] += int(count)
+    return counts
+
+
+def mixed_type_ratio(type_counts: Dict[str, int]) -> float:
+    """Share of non-empty cells that do not hold the column's dominant type."""
+    filled = {name: count for name, count in type_counts.items() if name != "empty"}
+    total = sum(filled.values())
+    if not total:
+        return 0.0
+    return 1 - max(filled.values()) / total